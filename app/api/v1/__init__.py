@@ -1 +1,10 @@
 # API v1 package
+from fastapi import APIRouter
+
+from app.api.v1.cves import router as cve_router
+from app.api.v1.sync import router as sync_router
+
+# All v1 endpoints, mounted by the application under a single prefix
+router = APIRouter(prefix="/api/v1")
+router.include_router(cve_router)
+router.include_router(sync_router)
@@ -2,15 +2,20 @@
 CVE API endpoints for CRUD operations and filtering.
 """
 from datetime import datetime, timedelta
-from typing import Optional, List
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Optional, List
 from fastapi import APIRouter, HTTPException, Query, Depends, Path
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+import msgspec
+from pydantic import BaseModel
 import structlog
 
+from app.core.errors import error_scope
 from app.services.cve_service import CVEService
 from app.models.cve import (
-    CVEResponse, CVEListResponse, CVEFilters, CVEStatistics,
-    CVECreate, CVEUpdate, ErrorResponse
+    CVEResponse, CVEListResponse, CVESearchResponse, CVEFilters, CVEStatistics,
+    CVECreate, CVEUpdate, ErrorResponse, CVE_ID_PATTERN, normalize_cve_id,
+    CVSSSeverity, CVESortField, SortOrder, CVERecord
 )
 
 logger = structlog.get_logger(__name__)
@@ -18,11 +23,63 @@ logger = structlog.get_logger(__name__)
 router = APIRouter(prefix="/cves", tags=["CVEs"])
 
 
+@lru_cache()
 def get_cve_service() -> CVEService:
-    """Dependency for getting CVE service."""
+    """Dependency for getting the shared CVE service."""
     return CVEService()
 
 
+def _msgspec_response(payload: Any) -> Response:
+    """Encode CVERecord payloads with msgspec, bypassing response_model serialization."""
+    return Response(content=msgspec.json.encode(payload), media_type="application/json")
+
+
+async def _next_page(pages: AsyncGenerator[List[CVERecord], None]) -> Optional[List[CVERecord]]:
+    """Get the next page from a page stream, or None once it is exhausted."""
+    try:
+        return await pages.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+async def _stream_response(
+    pages: AsyncGenerator[List[CVERecord], None],
+    message: str,
+    **log_fields
+) -> StreamingResponse:
+    """
+    Stream pages of CVERecords as a single JSON array, logging the total once sent.
+    
+    The first page is fetched before responding, so a failing query still becomes
+    an error status. A failure after that aborts the response rather than ending
+    the array early, so clients never mistake a partial list for a complete one.
+    """
+    first_page = await _next_page(pages)
+    
+    async def encode() -> AsyncGenerator[bytes, None]:
+        count = 0
+        yield b"["
+        page = first_page
+        try:
+            while page is not None:
+                # Each page encodes as a JSON array; splice its elements into the outer one
+                yield (b"," if count else b"") + msgspec.json.encode(page)[1:-1]
+                count += len(page)
+                page = await _next_page(pages)
+        except Exception as e:
+            logger.error(f"{message} failed mid-stream", count=count, error=str(e), **log_fields)
+            raise
+        yield b"]"
+        logger.info(message, count=count, **log_fields)
+    
+    return StreamingResponse(encode(), media_type="application/json")
+
+
+def _model_response(model: BaseModel) -> Response:
+    """Serialize an already-validated model once, skipping response_model re-validation."""
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+
 @router.get("/", response_model=CVEListResponse, responses={500: {"model": ErrorResponse}})
 async def list_cves(
     page: int = Query(1, ge=1, description="Page number"),
@@ -31,13 +88,13 @@ async def list_cves(
     year: Optional[int] = Query(None, ge=1999, le=2030, description="Filter by publication year"),
     min_score: Optional[float] = Query(None, ge=0, le=10, description="Minimum CVSS score"),
     max_score: Optional[float] = Query(None, ge=0, le=10, description="Maximum CVSS score"),
-    severity: Optional[str] = Query(None, description="CVSS severity (LOW, MEDIUM, HIGH, CRITICAL)"),
+    severity: Optional[CVSSSeverity] = Query(None, description="CVSS severity (LOW, MEDIUM, HIGH, CRITICAL)"),
     vuln_status: Optional[str] = Query(None, description="Vulnerability status"),
     modified_since: Optional[datetime] = Query(None, description="CVEs modified since this date"),
     published_since: Optional[datetime] = Query(None, description="CVEs published since this date"),
     keyword: Optional[str] = Query(None, description="Keyword search in description"),
-    sort: Optional[str] = Query("last_modified", description="Sort field (last_modified, published, cve_id, cvss_v3_score)"),
-    order: Optional[str] = Query("desc", description="Sort order (asc, desc)"),
+    sort: CVESortField = Query("last_modified", description="Sort field (last_modified, published, cve_id, cvss_v3_score, cvss_v2_score)"),
+    order: SortOrder = Query("desc", description="Sort order (asc, desc)"),
     cve_service: CVEService = Depends(get_cve_service)
 ):
     """
@@ -54,11 +111,18 @@ async def list_cves(
     - **modified_since**: Filter CVEs modified since date
     - **published_since**: Filter CVEs published since date
     - **keyword**: Search keyword in CVE description
-    - **sort**: Sort field (last_modified, published, cve_id, cvss_v3_score)
+    - **sort**: Sort field (last_modified, published, cve_id, cvss_v3_score, cvss_v2_score)
     - **order**: Sort order (asc, desc)
     """
-    try:
-        filters = CVEFilters(
+    if min_score is not None and max_score is not None and max_score < min_score:
+        raise HTTPException(
+            status_code=400,
+            detail="max_score must be greater than or equal to min_score"
+        )
+    
+    async with error_scope("Error retrieving CVE list"):
+        # Query() has already validated every parameter, so skip CVEFilters' validators
+        filters = CVEFilters.model_construct(
             cve_id=cve_id,
             year=year,
             min_score=min_score,
@@ -82,11 +146,7 @@ async def list_cves(
             filters=filters.dict(exclude_none=True)
         )
         
-        return result
-    
-    except Exception as e:
-        logger.error("Error retrieving CVE list", error=str(e))
-        raise HTTPException(status_code=500, detail="Internal server error")
+        return _msgspec_response(result)
 
 
 @router.get("/count", response_model=dict, responses={500: {"model": ErrorResponse}})
@@ -99,17 +159,14 @@ async def get_cve_count(
     Returns:
         dict: {"total": number} - Simple count response
     """
-    try:
-        stats = await cve_service.get_statistics()
-        return {"total": stats.total_cves}
-    except Exception as e:
-        logger.error("Error getting CVE count", error=str(e))
-        raise HTTPException(status_code=500, detail="Internal server error")
+    async with error_scope("Error getting CVE count"):
+        total = await cve_service.count_cves()
+        return {"total": total}
 
 
 @router.get("/{cve_id}", response_model=CVEResponse, responses={404: {"model": ErrorResponse}, 422: {"model": ErrorResponse}, 500: {"model": ErrorResponse}})
 async def get_cve(
-    cve_id: str = Path(..., min_length=1, pattern=r"^CVE-\d{4}-\d{4,}$", description="CVE identifier (e.g., CVE-2023-12345)"),
+    cve_id: str = Path(..., min_length=1, pattern=CVE_ID_PATTERN, description="CVE identifier (e.g., CVE-2023-12345)"),
     cve_service: CVEService = Depends(get_cve_service)
 ):
     """
@@ -117,8 +174,8 @@ async def get_cve(
     
     - **cve_id**: CVE identifier in format CVE-YYYY-NNNNN
     """
-    try:
-        cve = await cve_service.get_cve_by_id(cve_id.upper())
+    async with error_scope("Error retrieving CVE", cve_id=cve_id):
+        cve = await cve_service.get_cve_by_id(normalize_cve_id(cve_id))
         
         if not cve:
             raise HTTPException(
@@ -127,13 +184,7 @@ async def get_cve(
             )
         
         logger.info("CVE retrieved", cve_id=cve_id)
-        return cve
-    
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error("Error retrieving CVE", cve_id=cve_id, error=str(e))
-        raise HTTPException(status_code=500, detail="Internal server error")
+        return _model_response(cve)
 
 
 @router.get("/year/{year}", response_model=List[CVEResponse], responses={422: {"model": ErrorResponse}, 500: {"model": ErrorResponse}})
@@ -146,15 +197,10 @@ async def get_cves_by_year(
     
     - **year**: Publication year (1999-2030)
     """
-    try:
-        cves = await cve_service.get_cves_by_year(year)
-        
-        logger.info(f"Retrieved {len(cves)} CVEs for year {year}")
-        return cves
-    
-    except Exception as e:
-        logger.error("Error retrieving CVEs by year", year=year, error=str(e))
-        raise HTTPException(status_code=500, detail="Internal server error")
+    async with error_scope("Error retrieving CVEs by year", year=year):
+        return await _stream_response(
+            cve_service.get_cves_by_year(year), "Retrieved CVEs for year", year=year
+        )
 
 
 @router.get("/score/{min_score}/{max_score}", response_model=List[CVEResponse], responses={400: {"model": ErrorResponse}, 422: {"model": ErrorResponse}, 500: {"model": ErrorResponse}})
@@ -169,30 +215,19 @@ async def get_cves_by_score_range(
     - **min_score**: Minimum CVSS score (0.0-10.0)
     - **max_score**: Maximum CVSS score (0.0-10.0)
     """
-    try:
+    async with error_scope("Error retrieving CVEs by score range", min_score=min_score, max_score=max_score):
         if min_score > max_score:
             raise HTTPException(
                 status_code=400,
                 detail="min_score cannot be greater than max_score"
             )
         
-        cves = await cve_service.get_cves_by_score_range(min_score, max_score)
-        
-        logger.info(
-            f"Retrieved {len(cves)} CVEs with score range {min_score}-{max_score}"
-        )
-        return cves
-    
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(
-            "Error retrieving CVEs by score range",
+        return await _stream_response(
+            cve_service.get_cves_by_score_range(min_score, max_score),
+            "Retrieved CVEs by score range",
             min_score=min_score,
-            max_score=max_score,
-            error=str(e)
+            max_score=max_score
         )
-        raise HTTPException(status_code=500, detail="Internal server error")
 
 
 @router.get("/modified/{days}", response_model=List[CVEResponse], responses={422: {"model": ErrorResponse}, 500: {"model": ErrorResponse}})
@@ -205,47 +240,31 @@ async def get_recent_cves(
     
     - **days**: Number of days to look back (1-365)
     """
-    try:
-        cves = await cve_service.get_recent_cves(days)
-        
-        logger.info(f"Retrieved {len(cves)} CVEs from last {days} days")
-        return cves
-    
-    except Exception as e:
-        logger.error(
-            "Error retrieving recent CVEs",
-            days=days,
-            error=str(e)
+    async with error_scope("Error retrieving recent CVEs", days=days):
+        return await _stream_response(
+            cve_service.get_recent_cves(days), "Retrieved recent CVEs", days=days
         )
-        raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.get("/search/", response_model=List[CVEResponse], responses={422: {"model": ErrorResponse}, 500: {"model": ErrorResponse}})
+@router.get("/search/", response_model=CVESearchResponse, responses={400: {"model": ErrorResponse}, 422: {"model": ErrorResponse}, 500: {"model": ErrorResponse}})
 async def search_cves(
     q: str = Query(..., min_length=3, description="Search query"),
-    limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results per page"),
+    after: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
     cve_service: CVEService = Depends(get_cve_service)
 ):
     """
-    Full-text search for CVEs in descriptions.
+    Full-text search for CVEs in descriptions, ranked by relevance.
     
     - **q**: Search query (minimum 3 characters)
-    - **limit**: Maximum number of results to return
+    - **limit**: Maximum number of results to return per page (1-100)
+    - **after**: Cursor returned as next_cursor by the previous page
     """
-    try:
-        cves = await cve_service.search_cves(q, limit)
+    async with error_scope("Error searching CVEs", bad_request_errors=(ValueError,), query=q):
+        cves, next_cursor = await cve_service.search_cves(q, limit, after)
         
         logger.info(f"Search for '{q}' returned {len(cves)} results")
-        return cves
-    
-    except Exception as e:
-        logger.error(
-            "Error searching CVEs",
-            query=q,
-            error=str(e)
-        )
-        raise HTTPException(status_code=500, detail="Internal server error")
-
+        return _msgspec_response({"items": cves, "next_cursor": next_cursor})
 
 
 @router.get("/statistics/", response_model=CVEStatistics, responses={500: {"model": ErrorResponse}})
@@ -255,15 +274,11 @@ async def get_cve_statistics(
     """
     Get CVE statistics including counts by severity level.
     """
-    try:
+    async with error_scope("Error retrieving CVE statistics"):
         stats = await cve_service.get_statistics()
         
         logger.info("CVE statistics retrieved", total_cves=stats.total_cves)
-        return stats
-    
-    except Exception as e:
-        logger.error("Error retrieving CVE statistics", error=str(e))
-        raise HTTPException(status_code=500, detail="Internal server error")
+        return _model_response(stats)
 
 
 @router.post("/", response_model=CVEResponse, status_code=201, responses={400: {"model": ErrorResponse}, 422: {"model": ErrorResponse}, 500: {"model": ErrorResponse}})
@@ -277,17 +292,11 @@ async def create_cve(
     This endpoint is typically used for manual CVE creation or testing.
     Production data should come through the synchronization process.
     """
-    try:
+    async with error_scope("Error creating CVE", bad_request_errors=(ValueError,)):
         cve = await cve_service.create_cve(cve_data)
         
         logger.info("CVE created", cve_id=cve.cve_id)
         return cve
-    
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        logger.error("Error creating CVE", error=str(e))
-        raise HTTPException(status_code=500, detail="Internal server error")
 
 
 @router.put("/{cve_id}", response_model=CVEResponse, responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}, 422: {"model": ErrorResponse}, 500: {"model": ErrorResponse}})
@@ -302,8 +311,8 @@ async def update_cve(
     This endpoint is typically used for manual CVE updates or corrections.
     Production data should come through the synchronization process.
     """
-    try:
-        cve = await cve_service.update_cve(cve_id.upper(), cve_data)
+    async with error_scope("Error updating CVE", cve_id=cve_id):
+        cve = await cve_service.update_cve(normalize_cve_id(cve_id), cve_data)
         
         if not cve:
             raise HTTPException(
@@ -313,12 +322,6 @@ async def update_cve(
         
         logger.info("CVE updated", cve_id=cve_id)
         return cve
-    
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error("Error updating CVE", cve_id=cve_id, error=str(e))
-        raise HTTPException(status_code=500, detail="Internal server error")
 
 
 @router.delete("/{cve_id}", status_code=204)
@@ -331,8 +334,8 @@ async def delete_cve(
     
     Use with caution. This permanently removes the CVE from the database.
     """
-    try:
-        success = await cve_service.delete_cve(cve_id.upper())
+    async with error_scope("Error deleting CVE", cve_id=cve_id):
+        success = await cve_service.delete_cve(normalize_cve_id(cve_id))
         
         if not success:
             raise HTTPException(
@@ -342,12 +345,6 @@ async def delete_cve(
         
         logger.info("CVE deleted", cve_id=cve_id)
         return
-    
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error("Error deleting CVE", cve_id=cve_id, error=str(e))
-        raise HTTPException(status_code=500, detail="Internal server error")
 
 
 # Error handlers moved to main app
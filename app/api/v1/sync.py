@@ -2,11 +2,12 @@
 Synchronization API endpoints for managing CVE data updates.
 """
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query, Response
 from fastapi.responses import JSONResponse
 import structlog
 
-from app.services.sync_service import SyncService
+from app.core.errors import error_scope
+from app.services.sync_service import SyncService, get_sync_service
 from app.core.database import HealthCheck
 from app.models.cve import SyncStatus, SyncTrigger, ErrorResponse, HealthCheck as HealthCheckModel
 
@@ -15,11 +16,6 @@ logger = structlog.get_logger(__name__)
 router = APIRouter(prefix="/sync", tags=["Synchronization"])
 
 
-def get_sync_service() -> SyncService:
-    """Dependency for getting sync service."""
-    return SyncService()
-
-
 @router.post("/", response_model=dict, status_code=202, responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}})
 async def trigger_sync(
     sync_request: SyncTrigger,
@@ -34,7 +30,7 @@ async def trigger_sync(
     
     Returns a sync ID to track the operation status.
     """
-    try:
+    async with error_scope("Error triggering synchronization", bad_request_errors=(ValueError,)):
         sync_id = await sync_service.trigger_sync(sync_request)
         
         logger.info(
@@ -49,12 +45,6 @@ async def trigger_sync(
             "sync_id": sync_id,
             "sync_type": sync_request.sync_type
         }
-    
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        logger.error("Error triggering synchronization", error=str(e))
-        raise HTTPException(status_code=500, detail="Internal server error")
 
 
 @router.get("/status", response_model=SyncStatus, responses={404: {"model": ErrorResponse}, 500: {"model": ErrorResponse}})
@@ -67,7 +57,7 @@ async def get_sync_status(
     
     - **sync_id**: Specific sync ID to check (optional, defaults to latest)
     """
-    try:
+    async with error_scope("Error retrieving sync status"):
         status = await sync_service.get_sync_status(sync_id)
         
         if not status:
@@ -78,12 +68,6 @@ async def get_sync_status(
         
         logger.debug("Sync status retrieved", sync_id=status.id, status=status.status)
         return status
-    
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error("Error retrieving sync status", error=str(e))
-        raise HTTPException(status_code=500, detail="Internal server error")
 
 
 @router.get("/status/{sync_id}", response_model=SyncStatus, responses={404: {"model": ErrorResponse}, 500: {"model": ErrorResponse}})
@@ -96,7 +80,7 @@ async def get_specific_sync_status(
     
     - **sync_id**: Sync ID to check
     """
-    try:
+    async with error_scope("Error retrieving specific sync status", sync_id=sync_id):
         status = await sync_service.get_sync_status(sync_id)
         
         if not status:
@@ -107,12 +91,6 @@ async def get_specific_sync_status(
         
         logger.debug("Specific sync status retrieved", sync_id=sync_id, status=status.status)
         return status
-    
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error("Error retrieving specific sync status", sync_id=sync_id, error=str(e))
-        raise HTTPException(status_code=500, detail="Internal server error")
 
 
 @router.get("/history", response_model=List[SyncStatus], responses={500: {"model": ErrorResponse}})
@@ -125,15 +103,11 @@ async def get_sync_history(
     
     - **limit**: Number of sync records to return (1-100)
     """
-    try:
+    async with error_scope("Error retrieving sync history"):
         history = await sync_service.get_sync_history(limit)
         
         logger.debug(f"Retrieved {len(history)} sync history records")
         return history
-    
-    except Exception as e:
-        logger.error("Error retrieving sync history", error=str(e))
-        raise HTTPException(status_code=500, detail="Internal server error")
 
 
 @router.get("/running", response_model=dict, responses={500: {"model": ErrorResponse}})
@@ -143,17 +117,13 @@ async def check_sync_running(
     """
     Check if a synchronization is currently running.
     """
-    try:
+    async with error_scope("Error checking sync status"):
         is_running = sync_service.is_sync_running()
         
         return {
             "is_running": is_running,
             "message": "Synchronization is running" if is_running else "No synchronization running"
         }
-    
-    except Exception as e:
-        logger.error("Error checking sync status", error=str(e))
-        raise HTTPException(status_code=500, detail="Internal server error")
 
 
 @router.post("/cancel", response_model=dict, responses={404: {"model": ErrorResponse}, 500: {"model": ErrorResponse}})
@@ -163,7 +133,7 @@ async def cancel_sync(
     """
     Cancel the currently running synchronization.
     """
-    try:
+    async with error_scope("Error cancelling synchronization"):
         cancelled = await sync_service.cancel_running_sync()
         
         if not cancelled:
@@ -178,12 +148,6 @@ async def cancel_sync(
             "message": "Synchronization cancelled successfully",
             "cancelled": True
         }
-    
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error("Error cancelling synchronization", error=str(e))
-        raise HTTPException(status_code=500, detail="Internal server error")
 
 
 @router.delete("/cleanup", response_model=dict, responses={422: {"model": ErrorResponse}, 500: {"model": ErrorResponse}})
@@ -196,7 +160,7 @@ async def cleanup_old_sync_records(
     
     - **days**: Number of days of records to keep (1-365)
     """
-    try:
+    async with error_scope("Error cleaning up sync records"):
         deleted_count = await sync_service.cleanup_old_sync_records(days)
         
         logger.info(f"Cleaned up {deleted_count} old sync records")
@@ -206,27 +170,23 @@ async def cleanup_old_sync_records(
             "deleted_count": deleted_count,
             "days_kept": days
         }
-    
-    except Exception as e:
-        logger.error("Error cleaning up sync records", error=str(e))
-        raise HTTPException(status_code=500, detail="Internal server error")
 
 
 @router.get("/health", response_model=HealthCheckModel, responses={500: {"model": ErrorResponse}})
-async def sync_health_check():
+async def sync_health_check(response: Response):
     """
     Health check for synchronization system.
+    
+    The X-Cache response header reports whether health data was served
+    fresh from cache, as a stale fallback while Supabase is failing, or fetched (miss).
     """
     try:
-        # Check database connectivity
-        db_connected = await HealthCheck.check_supabase_connection()
-        
-        # Get basic database info
-        db_info = await HealthCheck.get_database_info()
+        # Connectivity, CVE count and latest sync come from one concurrent probe
+        health = await HealthCheck.gather_health()
+        response.headers["X-Cache"] = health["cache_status"]
         
-        # Get latest sync status
-        sync_service = SyncService()
-        latest_sync = await sync_service.get_sync_status()
+        db_connected = health["database_connected"]
+        latest_sync = health["latest_sync"]
         
         status = "healthy" if db_connected else "unhealthy"
         
@@ -234,8 +194,8 @@ async def sync_health_check():
             status=status,
             timestamp=datetime.now(timezone.utc),
             database_connected=db_connected,
-            last_sync=latest_sync.completed_at if latest_sync else None,
-            total_cves=db_info.get("total_cves", 0),
+            last_sync=latest_sync["completed_at"] if latest_sync else None,
+            total_cves=health["total_cves"],
             version="1.0.0"
         )
         
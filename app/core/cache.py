@@ -0,0 +1,334 @@
+"""
+Redis response cache management.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable
+
+import redis.asyncio as redis
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger(__name__)
+
+# All cached API responses live under this prefix so writes can evict them in one sweep
+CACHE_PREFIX = "cves:"
+
+# Endpoints that stream unbounded result sets; caching them would buffer the whole body
+STREAMED_PATH_PREFIXES = ("/api/v1/cves/year/", "/api/v1/cves/score/", "/api/v1/cves/modified/")
+
+
+class _LeaderCancelled(Exception):
+    """Raised to single_flight followers when the caller computing their result is cancelled."""
+
+
+class LocalLRUCache:
+    """
+    Small in-process LRU cache whose entries also expire after ttl seconds.
+    
+    Other processes cannot evict these entries, so ttl bounds how long a write
+    made elsewhere can go unseen here.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a live value and mark it most recently used, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        """Drop a key if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+
+
+class CacheManager:
+    """Redis cache client manager."""
+
+    def __init__(self):
+        self._redis_client: Optional[redis.Redis] = None
+        # In-process fallback store used when Redis is not configured: key -> (expires_at, value)
+        self._local_values: Dict[str, Tuple[float, str]] = {}
+        # Responses currently being computed in this process, keyed by cache key
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # In-process caches in front of Redis; invalidate() clears them too
+        self._local_caches: List[LocalLRUCache] = []
+
+    @property
+    def redis(self) -> Optional[redis.Redis]:
+        """Get Redis client instance, or None when caching is not configured."""
+        if not settings.cache_enabled or not settings.redis_url:
+            return None
+        if not self._redis_client:
+            self._redis_client = redis.from_url(settings.redis_url)
+            logger.info("Redis cache client initialized")
+        return self._redis_client
+
+    async def close_cache(self) -> None:
+        """Close Redis client connections."""
+        if self._redis_client:
+            await self._redis_client.close()
+            self._redis_client = None
+            logger.info("Redis cache client closed")
+
+    async def get_response(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached response (body, status code, media type) by key."""
+        client = self.redis
+        if client is None:
+            return None
+        try:
+            cached = await client.hgetall(key)
+            if not cached:
+                return None
+            return {
+                "body": cached[b"body"],
+                "status_code": int(cached[b"status_code"]),
+                "media_type": cached[b"media_type"].decode(),
+                "etag": cached[b"etag"].decode() if b"etag" in cached else compute_etag(cached[b"body"]),
+                "headers": json.loads(cached[b"headers"]) if b"headers" in cached else {},
+            }
+        except Exception as e:
+            logger.warning("Cache read failed", key=key, error=str(e))
+            return None
+
+    async def set_response(
+        self,
+        key: str,
+        body: bytes,
+        status_code: int,
+        media_type: str,
+        etag: str,
+        ttl: int,
+        headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Cache a response body with its status code, media type, ETag and headers."""
+        client = self.redis
+        if client is None:
+            return
+        try:
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.hset(key, mapping={
+                    "body": body,
+                    "status_code": status_code,
+                    "media_type": media_type,
+                    "etag": etag,
+                    "headers": json.dumps(headers or {}),
+                })
+                pipe.expire(key, ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Cache write failed", key=key, error=str(e))
+
+    async def _get_value(self, key: str) -> Optional[str]:
+        """Get a raw cached value from Redis or the in-process store."""
+        client = self.redis
+        if client is None:
+            entry = self._local_values.get(key)
+            if entry and entry[0] > time.time():
+                return entry[1]
+            return None
+        try:
+            return await client.get(key)
+        except Exception as e:
+            logger.warning("Cache read failed", key=key, error=str(e))
+            return None
+
+    async def _set_value(self, key: str, value: str, ttl: int) -> None:
+        """Set a raw cached value in Redis or the in-process store."""
+        client = self.redis
+        if client is None:
+            self._local_values[key] = (time.time() + ttl, value)
+            return
+        try:
+            await client.set(key, value, ex=ttl)
+        except Exception as e:
+            logger.warning("Cache write failed", key=key, error=str(e))
+
+    async def get_with_fallback(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        fresh_ttl: int,
+        stale_ttl: int,
+        timeout: Optional[float] = None
+    ) -> Tuple[Any, str]:
+        """
+        Get a JSON-serializable value, refreshing it through fetch when no longer fresh.
+        
+        If the refresh fails or times out, the last cached value is served until
+        stale_ttl expires. Returns (value, cache_state) where cache_state is one of
+        "fresh", "stale" or "miss"; the fetch error is re-raised if nothing is cached.
+        """
+        raw = await self._get_value(key)
+        cached = json.loads(raw) if raw else None
+        now = time.time()
+        
+        if cached and cached["fresh_until"] > now:
+            return cached["value"], "fresh"
+        
+        try:
+            value = await asyncio.wait_for(fetch(), timeout=timeout)
+        except Exception as e:
+            if cached:
+                logger.warning("Serving stale cached value", key=key, error=str(e))
+                return cached["value"], "stale"
+            raise
+        
+        await self._set_value(
+            key,
+            json.dumps({"value": value, "fresh_until": now + fresh_ttl}),
+            stale_ttl
+        )
+        return value, "miss"
+
+    async def single_flight(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]],
+        lock_ttl_ms: int = 5000
+    ) -> Dict[str, Any]:
+        """
+        Compute a response once across concurrent identical cache misses.
+        
+        Callers in this process share the first caller's result; if that caller is
+        cancelled (say its client disconnects), a waiting caller takes over the fetch.
+        Across processes a short Redis lock elects one leader; the others poll for the
+        entry the leader caches and compute it themselves only if it does not appear
+        before the lock expires.
+        """
+        while (inflight := self._inflight.get(key)) is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except _LeaderCancelled:
+                continue
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._fetch_with_lock(key, fetch, lock_ttl_ms)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            # Followers retry instead of failing with this caller's cancellation
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved so an unawaited future does not log a warning
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _fetch_with_lock(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]],
+        lock_ttl_ms: int
+    ) -> Dict[str, Any]:
+        """Run fetch while holding the cross-process lock for key, or wait for its holder."""
+        client = self.redis
+        if client is None:
+            return await fetch()
+        
+        lock_key = f"{key}:lock"
+        try:
+            acquired = await client.set(lock_key, 1, nx=True, px=lock_ttl_ms)
+        except Exception as e:
+            logger.warning("Cache lock failed", key=key, error=str(e))
+            return await fetch()
+        
+        if not acquired:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + lock_ttl_ms / 1000
+            while loop.time() < deadline:
+                await asyncio.sleep(0.05)
+                cached = await self.get_response(key)
+                if cached:
+                    return cached
+            return await fetch()
+        
+        try:
+            return await fetch()
+        finally:
+            try:
+                await client.delete(lock_key)
+            except Exception as e:
+                logger.warning("Cache lock release failed", key=key, error=str(e))
+
+    def local_cache(self, maxsize: int, ttl: float) -> LocalLRUCache:
+        """Create an in-process LRU cache that is cleared whenever CVE data is invalidated."""
+        cache = LocalLRUCache(maxsize, ttl)
+        self._local_caches.append(cache)
+        return cache
+
+    async def invalidate(self, pattern: str = f"{CACHE_PREFIX}*") -> int:
+        """Delete all cached entries matching a key pattern, and clear the in-process caches."""
+        for cache in self._local_caches:
+            cache.clear()
+        client = self.redis
+        if client is None:
+            return 0
+        deleted = 0
+        try:
+            keys = [key async for key in client.scan_iter(match=pattern, count=500)]
+            if keys:
+                deleted = await client.delete(*keys)
+            logger.debug("Cache invalidated", pattern=pattern, deleted=deleted)
+        except Exception as e:
+            logger.warning("Cache invalidation failed", pattern=pattern, error=str(e))
+        return deleted
+
+
+# Global cache manager instance
+cache_manager = CacheManager()
+
+
+def build_cache_key(path: str, query_params) -> str:
+    """Build a cache key from the request path and its sorted query string."""
+    query = "&".join(f"{k}={v}" for k, v in sorted(query_params.multi_items()))
+    digest = hashlib.sha1(f"{path}?{query}".encode()).hexdigest()
+    return f"{CACHE_PREFIX}resp:{digest}"
+
+
+def compute_etag(body: bytes) -> str:
+    """Compute a strong ETag from a response body."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def get_cache_ttl(path: str) -> Optional[int]:
+    """Get the cache TTL tier for a request path, or None if it is not cacheable."""
+    if path == "/api/v1/cves/count":
+        return settings.cache_ttl_short
+    if path == "/api/v1/cves/statistics/":
+        return settings.cache_ttl_long
+    if path.startswith(STREAMED_PATH_PREFIXES):
+        return None
+    if path.startswith("/api/v1/cves/"):
+        return settings.cache_ttl_normal
+    return None
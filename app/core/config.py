@@ -5,7 +5,7 @@ import os
 from typing import List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
-from functools import lru_cache
+from functools import lru_cache, cached_property
 
 
 class Settings(BaseSettings):
@@ -25,6 +25,10 @@ class Settings(BaseSettings):
     supabase_url: str
     supabase_key: str
     supabase_service_key: Optional[str] = None
+    supabase_timeout: int = 30  # seconds per PostgREST request
+    supabase_http2: bool = True
+    supabase_max_connections: int = 50
+    supabase_max_keepalive_connections: int = 20
     
     # Database Configuration (alternative direct connection)
     database_url: Optional[str] = None
@@ -32,19 +36,39 @@ class Settings(BaseSettings):
     # NVD API Configuration
     nvd_api_base_url: str = "https://services.nvd.nist.gov/rest/json/cves/2.0"
     nvd_api_key: Optional[str] = None
-    nvd_rate_limit_delay: float = 1.0
+    nvd_rate_limit_delay: float = 1.0  # base seconds between retries of a failed request
+    nvd_rate_limit_window: int = 30  # seconds; NVD counts requests over a rolling window
+    nvd_requests_per_window: int = 5  # NVD's public limit without an API key
+    nvd_requests_per_window_with_key: int = 50
     nvd_max_retries: int = 3
     nvd_results_per_page: int = 2000
-    nvd_timeout: int = 30
+    nvd_timeout: int = 30  # seconds an NVD response may go without sending data
+    nvd_connect_timeout: int = 10  # seconds to get a connection to NVD
+    nvd_concurrency: int = 3  # NVD page requests in flight during a sync
+    nvd_async_dns: bool = True  # use aiodns for NVD lookups when it is installed
+    nvd_cve_cache_ttl: int = 3600  # seconds NVDClient.get_cve_by_id results are reused
     
     # Sync Configuration
     sync_enabled: bool = True
     sync_interval_hours: int = 24
     sync_full_refresh_days: int = 7
     sync_batch_size: int = 1000
-    
+    sync_progress_interval: float = 5.0  # seconds between sync progress writes
+
+    # Cache Configuration
+    redis_url: Optional[str] = None
+    cache_enabled: bool = True
+    cache_ttl_short: int = 5  # seconds - counters
+    cache_ttl_normal: int = 30  # seconds - list, search and lookup endpoints
+    cache_ttl_long: int = 300  # seconds - statistics
+    stats_cache_ttl: int = 60  # seconds before get_statistics recomputes its counts
+    cve_cache_size: int = 1024  # CVEs kept in each process's get_cve_by_id cache
+    cve_cache_ttl: int = 30  # seconds a CVE stays in the in-process cache
+    health_cache_fresh_ttl: int = 10  # seconds before health data is refreshed
+    health_cache_stale_ttl: int = 3600  # seconds stale health data may be served on failure
+    health_stats_ttl: int = 60  # seconds between CVE count refreshes for /health
+    health_refresh_interval: int = 5  # seconds between background /health snapshots
 
-    
     # Security
     secret_key: str
     algorithm: str = "HS256"
@@ -81,19 +105,19 @@ class Settings(BaseSettings):
             raise ValueError("Secret key must be at least 32 characters long")
         return v
     
-    @property
+    @cached_property
     def is_development(self) -> bool:
         """Check if running in development environment."""
         return self.environment.lower() == "development"
     
-    @property
+    @cached_property
     def is_production(self) -> bool:
         """Check if running in production environment."""
         return self.environment.lower() == "production"
     
-    @property
+    @cached_property
     def database_connection_url(self) -> str:
-        """Get the database connection URL."""
+        """Get the database connection URL (computed once per settings instance)."""
         if self.database_url:
             return self.database_url
         # Construct from Supabase URL if direct URL not provided
@@ -3,10 +3,17 @@ Supabase database client management.
 """
 from typing import Optional
 from supabase import create_client, Client
+from supabase.lib.client_options import ClientOptions
+from postgrest.utils import SyncClient
+import asyncpg
+import httpx
 import structlog
 import asyncio
+import json
+import threading
 
 from app.core.config import settings
+from app.core.cache import cache_manager
 
 logger = structlog.get_logger(__name__)
 
@@ -16,30 +23,92 @@ class DatabaseManager:
     
     def __init__(self):
         self._supabase_client: Optional[Client] = None
+        self._pg_pool: Optional[asyncpg.Pool] = None
+        self._lock = threading.Lock()
     
     @property
     def supabase(self) -> Client:
         """Get Supabase admin client instance."""
-        if not self._supabase_client:
-            # Use service key for admin operations if available, otherwise use regular key
-            key = settings.supabase_service_key if settings.supabase_service_key else settings.supabase_key
-            self._supabase_client = create_client(
-                settings.supabase_url,
-                key
-            )
-            logger.info("Supabase admin client initialized")
+        if self._supabase_client is None:
+            # Double-checked so concurrent first requests create a single client
+            with self._lock:
+                if self._supabase_client is None:
+                    # Use service key for admin operations if available, otherwise use regular key
+                    key = settings.supabase_service_key if settings.supabase_service_key else settings.supabase_key
+                    client = create_client(
+                        settings.supabase_url,
+                        key,
+                        options=ClientOptions(
+                            schema="public",
+                            postgrest_client_timeout=settings.supabase_timeout
+                        )
+                    )
+                    _configure_postgrest_session(client)
+                    self._supabase_client = client
+                    logger.info("Supabase admin client initialized")
         return self._supabase_client
     
+    @property
+    def pg_pool(self) -> Optional[asyncpg.Pool]:
+        """Get the direct Postgres pool used for hot reads, or None if not configured."""
+        return self._pg_pool
+    
     async def init_database(self) -> None:
-        """Initialize Supabase client (no setup needed)."""
+        """Initialize Supabase client and, when DATABASE_URL is set, the Postgres pool."""
         # Just verify connection by accessing the client
         _ = self.supabase
         logger.info("Supabase database client ready")
+        
+        if settings.database_url:
+            self._pg_pool = await asyncpg.create_pool(
+                settings.database_url,
+                min_size=5,
+                max_size=20,
+                statement_cache_size=256,
+                init=_init_pg_connection
+            )
+            logger.info("Postgres read pool ready")
     
     async def close_database(self) -> None:
-        """Close Supabase client (cleanup if needed)."""
-        self._supabase_client = None
+        """Close Supabase client and the Postgres pool."""
+        with self._lock:
+            client, self._supabase_client = self._supabase_client, None
+        if client is not None:
+            client.postgrest.session.close()
         logger.info("Supabase client cleared")
+        
+        if self._pg_pool:
+            await self._pg_pool.close()
+            self._pg_pool = None
+            logger.info("Postgres read pool closed")
+
+
+def _configure_postgrest_session(client: Client) -> None:
+    """
+    Replace the PostgREST session with one sized for this service's request fan-out.
+    
+    Every table() and rpc() call shares this session, so requests reuse pooled
+    keep-alive connections and, with HTTP/2, multiplex over a single one.
+    """
+    postgrest = client.postgrest
+    session = postgrest.session
+    postgrest.session = SyncClient(
+        base_url=session.base_url,
+        headers=session.headers,
+        timeout=session.timeout,
+        http2=settings.supabase_http2,
+        limits=httpx.Limits(
+            max_connections=settings.supabase_max_connections,
+            max_keepalive_connections=settings.supabase_max_keepalive_connections
+        )
+    )
+    session.close()
+
+
+async def _init_pg_connection(conn: asyncpg.Connection) -> None:
+    """Decode JSON columns into Python objects, matching what PostgREST returns."""
+    for json_type in ("json", "jsonb"):
+        await conn.set_type_codec(json_type, encoder=json.dumps, decoder=json.loads, schema="pg_catalog")
 
 
 # Global database manager instance
@@ -47,10 +116,21 @@ db_manager = DatabaseManager()
 
 
 def get_supabase_client() -> Client:
-    """Dependency for getting Supabase client."""
+    """Dependency for getting the shared Supabase client (created once by DatabaseManager)."""
     return db_manager.supabase
 
 
+def returning_columns(query, *columns: str):
+    """
+    Limit the rows a PostgREST write sends back to the given columns.
+    
+    Use for writes whose caller only needs the affected keys. return=minimal would
+    drop the body entirely, but this client then also drops the Content-Range count.
+    """
+    query.params = query.params.set("select", ",".join(columns))
+    return query
+
+
 # Database initialization and cleanup functions
 async def init_database():
     """Initialize Supabase database client."""
@@ -68,62 +148,140 @@ class HealthCheck:
     """Database health check utilities."""
     
     @staticmethod
-    async def check_supabase_connection() -> bool:
-        """Check Supabase connection health."""
+    async def _check_connection() -> bool:
+        """Run a lightweight query against the database; raises if unreachable."""
+        pool = db_manager.pg_pool
+        if pool is not None:
+            await pool.fetchval("SELECT 1")
+            return True
+        
+        client = get_supabase_client()
+        # Lightweight query to test connection - just get one record without counting
+        await asyncio.to_thread(client.table('cves').select('id').limit(1).execute)
+        return True
+    
+    @staticmethod
+    async def _count_cves() -> int:
+        """Get the estimated CVE count."""
+        pool = db_manager.pg_pool
+        if pool is not None:
+            count = await pool.fetchval("SELECT reltuples::bigint FROM pg_class WHERE relname = 'cves'")
+            return max(count or 0, 0)
+        
+        client = get_supabase_client()
+        result = await asyncio.to_thread(
+            client.table('cves').select('count', count='estimated').execute
+        )
+        return result.count if result.count is not None else 0
+    
+    @staticmethod
+    async def _last_sync() -> Optional[str]:
+        """Get the completion time of the last successful sync."""
+        client = get_supabase_client()
+        result = await asyncio.to_thread(
+            client.table('sync_status').select('completed_at').eq('status', 'completed').order('completed_at', desc=True).limit(1).execute
+        )
+        return result.data[0]['completed_at'] if result.data else None
+    
+    @staticmethod
+    async def _latest_sync_status() -> Optional[dict]:
+        """Get the most recently started sync record."""
+        client = get_supabase_client()
+        result = await asyncio.to_thread(
+            client.table('sync_status').select('status, completed_at').order('started_at', desc=True).limit(1).execute
+        )
+        return result.data[0] if result.data else None
+    
+    @staticmethod
+    async def _fetch_health() -> dict:
+        """Run all health queries concurrently in a single round of Supabase calls."""
+        results = await asyncio.gather(
+            HealthCheck._count_cves(),
+            HealthCheck._last_sync(),
+            HealthCheck._latest_sync_status(),
+            return_exceptions=True
+        )
+        if all(isinstance(r, Exception) for r in results):
+            raise results[0]
+        
+        total_cves, last_sync, latest_sync = [None if isinstance(r, Exception) else r for r in results]
+        return {
+            "database_connected": not isinstance(results[0], Exception),
+            "total_cves": total_cves or 0,
+            "last_sync": last_sync,
+            "latest_sync": latest_sync
+        }
+    
+    @staticmethod
+    async def _fetch_stats() -> dict:
+        """Get the CVE count and last successful sync concurrently."""
+        total_cves, last_sync = await asyncio.gather(HealthCheck._count_cves(), HealthCheck._last_sync())
+        return {"total_cves": total_cves, "last_sync": last_sync}
+    
+    @staticmethod
+    async def get_cached_stats() -> dict:
+        """
+        Get the CVE count and last sync time, refreshed at most every health_stats_ttl seconds.
+        
+        Keeps counting off the /health hot path; returns zeros if nothing could be fetched.
+        """
+        try:
+            stats, _ = await cache_manager.get_with_fallback(
+                "health:stats",
+                HealthCheck._fetch_stats,
+                fresh_ttl=settings.health_stats_ttl,
+                stale_ttl=settings.health_cache_stale_ttl,
+                timeout=settings.health_check_timeout
+            )
+            return stats
+        except Exception as e:
+            logger.error("Failed to get health stats", error=str(e))
+            return {"total_cves": 0, "last_sync": None}
+    
+    @staticmethod
+    async def gather_health() -> dict:
+        """
+        Get connectivity, CVE count and sync information in one concurrent probe.
+        
+        The returned dict carries a "cache_status" key ("fresh", "stale" or "miss")
+        describing whether the data came from the health cache.
+        """
         try:
-            # Add timeout to prevent hanging
-            async def _check():
-                client = get_supabase_client()
-                # Lightweight query to test connection - just get one record without counting
-                result = client.table('cves').select('id').limit(1).execute()
-                return True
-            
-            return await asyncio.wait_for(_check(), timeout=settings.health_check_timeout)
+            health, cache_status = await cache_manager.get_with_fallback(
+                "health:summary",
+                HealthCheck._fetch_health,
+                fresh_ttl=settings.health_cache_fresh_ttl,
+                stale_ttl=settings.health_cache_stale_ttl,
+                timeout=settings.health_check_timeout
+            )
+            return {**health, "cache_status": cache_status}
         except asyncio.TimeoutError:
-            logger.error("Supabase health check timed out", timeout=settings.health_check_timeout)
-            return False
+            logger.error("Health probe timed out", timeout=settings.health_check_timeout)
         except Exception as e:
-            logger.error("Supabase health check failed", error=str(e))
-            return False
+            logger.error("Health probe failed", error=str(e))
+        return {
+            "database_connected": False,
+            "total_cves": 0,
+            "last_sync": None,
+            "latest_sync": None,
+            "cache_status": "miss"
+        }
     
     @staticmethod
-    async def get_database_info() -> dict:
-        """Get database information for monitoring using Supabase."""
+    async def check_supabase_connection() -> bool:
+        """Check Supabase connection health, falling back to the last known state on failure."""
         try:
-            async def _get_info():
-                client = get_supabase_client()
-                
-                # Get CVE count (use estimated count for better performance)
-                try:
-                    cve_result = client.table('cves').select('count', count='estimated').execute()
-                    cve_count = cve_result.count if cve_result.count is not None else 0
-                except:
-                    # Fallback: if estimated count fails, try a simple query
-                    try:
-                        fallback_result = client.table('cves').select('id').execute()
-                        cve_count = len(fallback_result.data) if fallback_result.data else 0
-                    except:
-                        cve_count = 0
-                
-                # Try to get last sync (this might fail if sync_status table doesn't exist yet)
-                try:
-                    sync_result = client.table('sync_status').select('completed_at').eq('status', 'completed').order('completed_at', desc=True).limit(1).execute()
-                    last_sync = sync_result.data[0]['completed_at'] if sync_result.data else None
-                except:
-                    last_sync = None
-                    
-                return {
-                    "database_type": "Supabase",
-                    "total_cves": cve_count,
-                    "last_sync": last_sync,
-                    "connection_status": "connected"
-                }
-            
-            return await asyncio.wait_for(_get_info(), timeout=settings.health_check_timeout)
-            
+            connected, _ = await cache_manager.get_with_fallback(
+                "health:supabase_connection",
+                HealthCheck._check_connection,
+                fresh_ttl=settings.health_cache_fresh_ttl,
+                stale_ttl=settings.health_cache_stale_ttl,
+                timeout=settings.health_check_timeout
+            )
+            return connected
         except asyncio.TimeoutError:
-            logger.error("Database info gathering timed out", timeout=settings.health_check_timeout)
-            return {"error": "timeout", "connection_status": "timeout"}
+            logger.error("Supabase health check timed out", timeout=settings.health_check_timeout)
+            return False
         except Exception as e:
-            logger.error("Failed to get database info", error=str(e))
-            return {"error": str(e), "connection_status": "error"}
+            logger.error("Supabase health check failed", error=str(e))
+            return False
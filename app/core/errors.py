@@ -0,0 +1,34 @@
+"""
+Shared error translation for API endpoints.
+"""
+from contextlib import asynccontextmanager
+from typing import Tuple, Type
+
+from fastapi import HTTPException
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+@asynccontextmanager
+async def error_scope(
+    message: str,
+    bad_request_errors: Tuple[Type[Exception], ...] = (),
+    **log_fields
+):
+    """
+    Translate unexpected endpoint errors into HTTP responses.
+
+    HTTPExceptions pass through untouched, exceptions listed in bad_request_errors
+    become a 400 with their message, and anything else is logged with message and
+    log_fields and becomes a 500.
+    """
+    try:
+        yield
+    except HTTPException:
+        raise
+    except bad_request_errors as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(message, error=str(e), **log_fields)
+        raise HTTPException(status_code=500, detail="Internal server error")
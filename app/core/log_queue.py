@@ -0,0 +1,52 @@
+"""
+Background log writer so request handlers never block on stdout.
+"""
+import queue
+import threading
+from typing import Any, Optional, TextIO, BinaryIO, Union
+
+_STOP = object()
+
+
+class QueueLogWriter:
+    """File-like log sink that hands rendered records to a dedicated writer thread."""
+
+    def __init__(self, stream: Union[TextIO, BinaryIO]):
+        self._stream = stream
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self, data: Union[str, bytes]) -> None:
+        """Enqueue a record; writes go straight to the stream until the thread starts."""
+        if self._thread is None:
+            self._stream.write(data)
+            self._stream.flush()
+        else:
+            self._queue.put(data)
+
+    def flush(self) -> None:
+        """No-op: the writer thread flushes after draining the queue."""
+
+    def start(self) -> None:
+        """Start the writer thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Drain pending records and stop the writer thread."""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            data = self._queue.get()
+            if data is _STOP:
+                break
+            self._stream.write(data)
+            # Flush once per burst rather than once per record
+            if self._queue.empty():
+                self._stream.flush()
+        self._stream.flush()
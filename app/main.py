@@ -2,58 +2,95 @@
 FastAPI application entry point for CVE Assessment API.
 """
 import asyncio
+import logging
+import sys
 from contextlib import asynccontextmanager
+from typing import Optional, Tuple
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import ORJSONResponse, RedirectResponse, Response
 from fastapi.exceptions import RequestValidationError
+import orjson
 import structlog
 import uvicorn
 
 from app.core.config import settings
+from app.core.log_queue import QueueLogWriter
 from app.core.database import init_database, close_database, HealthCheck
-from app.api.v1.cves import router as cve_router
-from app.api.v1.sync import router as sync_router
+from app.core.cache import cache_manager, build_cache_key, compute_etag, get_cache_ttl
+from app.api.v1 import router as api_v1_router
 from app.services.sync_service import scheduled_sync_task
+from app.services.nvd_client import close_shared_session
 from app.models.cve import ErrorResponse, HealthCheck as HealthCheckModel
 from datetime import datetime, timezone
 
-# Configure structured logging
+# Configure structured logging. Records bypass the stdlib logging bridge: JSON output
+# is rendered with orjson and written as bytes, level filtering happens in the bound logger.
+_json_logs = settings.log_format == "json"
+_log_level = logging.getLevelName(settings.log_level.upper())
+_info_enabled = _log_level <= logging.INFO
+log_writer = QueueLogWriter(sys.stdout.buffer if _json_logs else sys.stdout)
+
 structlog.configure(
     processors=[
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
+        structlog.processors.add_log_level,
         structlog.processors.TimeStamper(fmt="iso"),
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
         structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer() if settings.log_format == "json" else structlog.dev.ConsoleRenderer(),
+        (lambda _, __, event_dict: orjson.dumps(event_dict, default=str)) if _json_logs else structlog.dev.ConsoleRenderer(),
     ],
     context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    wrapper_class=structlog.stdlib.BoundLogger,
+    logger_factory=structlog.BytesLoggerFactory(log_writer) if _json_logs else structlog.WriteLoggerFactory(log_writer),
+    wrapper_class=structlog.make_filtering_bound_logger(_log_level),
     cache_logger_on_first_use=True,
 )
 
 logger = structlog.get_logger(__name__)
 
 
+def _build_app_info() -> dict:
+    """Build the static /info payload from settings."""
+    return {
+        "name": settings.app_name,
+        "version": settings.app_version,
+        "environment": settings.environment,
+        "debug": settings.debug,
+        "sync_enabled": settings.sync_enabled,
+        "sync_interval_hours": settings.sync_interval_hours,
+        "nvd_api_url": settings.nvd_api_base_url,
+        "documentation": {
+            "swagger_ui": "/docs",
+            "redoc": "/redoc",
+            "openapi_json": "/openapi.json"
+        },
+        "frontend": "/static/index.html"
+    }
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     # Startup
+    log_writer.start()
     logger.info("Starting CVE Assessment API", version=settings.app_version)
     
+    sync_task = None
+    health_task = None
     try:
         # Initialize database
         await init_database()
         logger.info("Database initialized successfully")
         
+        # Settings are fixed for the process lifetime, so /info is encoded once
+        app.state.info_bytes = orjson.dumps(_build_app_info())
+        
+        # Keep a /health snapshot warm so load balancer probes are answered from memory
+        health_task = asyncio.create_task(health_refresh_task(app))
+        
         # Start background sync task if enabled (temporarily disabled for Supabase migration)
-        sync_task = None
         logger.info("Background sync temporarily disabled - migrating to Supabase operations")
         
         yield
@@ -75,9 +112,25 @@ async def lifespan(app: FastAPI):
                 pass
             logger.info("Background sync task stopped")
         
+        if health_task:
+            health_task.cancel()
+            try:
+                await health_task
+            except asyncio.CancelledError:
+                pass
+        
         # Close database connections
         await close_database()
         logger.info("Database connections closed")
+        
+        # Close cache connections
+        await cache_manager.close_cache()
+        
+        # Close the shared NVD API session
+        await close_shared_session()
+        
+        # Flush queued log records
+        log_writer.stop()
 
 
 # Create FastAPI application
@@ -111,24 +164,15 @@ app = FastAPI(
         "url": "https://opensource.org/licenses/MIT",
     },
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     debug=settings.debug
 )
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.allowed_origins,
-    allow_credentials=True,
-    allow_methods=settings.allowed_methods,
-    allow_headers=settings.allowed_headers,
-)
-
 # Mount static files for frontend
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
 # Include API routers
-app.include_router(cve_router, prefix="/api/v1")
-app.include_router(sync_router, prefix="/api/v1")
+app.include_router(api_v1_router)
 
 
 @app.get("/", include_in_schema=False)
@@ -137,65 +181,90 @@ async def root():
     return RedirectResponse(url="/docs")
 
 
-@app.get("/health", response_model=HealthCheckModel, responses={500: {"model": ErrorResponse}}, tags=["Health"])
-async def health_check():
-    """
-    Application health check endpoint.
-    
-    Returns the overall health status of the application including:
-    - Database connectivity
-    - Last synchronization status
-    - Basic statistics
-    """
+async def _build_health_body() -> bytes:
+    """Run the real health check and encode the HealthCheck response body."""
     try:
-        # Check database connectivity
+        # Check database connectivity with a single lightweight probe
         db_connected = await HealthCheck.check_supabase_connection()
         
-        # Get database info
-        db_info = await HealthCheck.get_database_info()
+        # Counts come from a periodically refreshed cache, never a per-request COUNT
+        stats = await HealthCheck.get_cached_stats()
         
         status = "healthy" if db_connected else "unhealthy"
         
-        return HealthCheckModel(
+        health = HealthCheckModel(
             status=status,
             timestamp=datetime.now(timezone.utc),
             database_connected=db_connected,
-            last_sync=db_info.get("last_sync"),
-            total_cves=db_info.get("total_cves", 0),
+            last_sync=stats["last_sync"],
+            total_cves=stats["total_cves"],
             version=settings.app_version
         )
     
     except Exception as e:
         logger.error("Health check failed", error=str(e))
-        return HealthCheckModel(
+        health = HealthCheckModel(
             status="unhealthy",
             timestamp=datetime.now(timezone.utc),
             database_connected=False,
             total_cves=0,
             version=settings.app_version
         )
+    
+    return orjson.dumps(health.model_dump())
+
+
+async def _refresh_health(app: FastAPI) -> Tuple[float, bytes]:
+    """Take a new health snapshot and store it on app.state as (taken_at, body)."""
+    snapshot = (asyncio.get_running_loop().time(), await _build_health_body())
+    app.state.health_cache = snapshot
+    return snapshot
+
+
+async def health_refresh_task(app: FastAPI):
+    """
+    Refresh the /health snapshot every health_refresh_interval seconds.
+    
+    Also keeps the cached summary behind /api/v1/sync/health warm, so neither
+    health endpoint waits on Supabase while it is fresh.
+    """
+    while True:
+        try:
+            await asyncio.gather(_refresh_health(app), HealthCheck.gather_health())
+        except Exception as e:
+            logger.error("Health refresh failed", error=str(e))
+        await asyncio.sleep(settings.health_refresh_interval)
+
+
+@app.get("/health", response_model=HealthCheckModel, responses={500: {"model": ErrorResponse}, 503: {"model": HealthCheckModel}}, tags=["Health"])
+async def health_check(request: Request):
+    """
+    Application health check endpoint.
+    
+    Returns the overall health status of the application including:
+    - Database connectivity
+    - Last synchronization status
+    - Basic statistics
+    
+    The response is a snapshot refreshed in the background, so probes never wait
+    on Supabase. A 503 means the snapshot has not been refreshed for three intervals.
+    """
+    snapshot = getattr(request.app.state, "health_cache", None)
+    if snapshot is None:
+        snapshot = await _refresh_health(request.app)
+    
+    taken_at, body = snapshot
+    age = asyncio.get_running_loop().time() - taken_at
+    status_code = 200 if age <= settings.health_refresh_interval * 3 else 503
+    return Response(content=body, status_code=status_code, media_type="application/json")
 
 
 @app.get("/info", responses={500: {"model": ErrorResponse}}, tags=["Info"])
-async def app_info():
+async def app_info(request: Request):
     """
     Get application information and configuration.
     """
-    return {
-        "name": settings.app_name,
-        "version": settings.app_version,
-        "environment": settings.environment,
-        "debug": settings.debug,
-        "sync_enabled": settings.sync_enabled,
-        "sync_interval_hours": settings.sync_interval_hours,
-        "nvd_api_url": settings.nvd_api_base_url,
-        "documentation": {
-            "swagger_ui": "/docs",
-            "redoc": "/redoc",
-            "openapi_json": "/openapi.json"
-        },
-        "frontend": "/static/index.html"
-    }
+    return Response(content=request.app.state.info_bytes, media_type="application/json")
 
 
 # Global exception handlers
@@ -215,61 +284,145 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     error_response = ErrorResponse(
         detail="Request validation failed",
         code="VALIDATION_ERROR"
-    ).model_dump(mode='json')
+    ).model_dump()
     error_response["errors"] = error_details
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=422,
         content=error_response
     )
 
 
-@app.exception_handler(500)
+@app.exception_handler(Exception)
 async def internal_server_error_handler(request: Request, exc: Exception):
-    """Handle internal server errors."""
+    """Handle any exception not translated by an endpoint's error scope."""
     logger.error("Internal server error", error=str(exc), path=request.url.path)
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content=ErrorResponse(
             detail="Internal server error",
             code="INTERNAL_ERROR"
-        ).model_dump(mode='json')
+        ).model_dump()
+    )
+
+
+# Headers the cache middleware does not store or replay
+UNCACHED_RESPONSE_HEADERS = frozenset({"content-length", "content-encoding", "content-type"})
+
+
+@app.middleware("http")
+async def response_cache_middleware(request: Request, call_next):
+    """Serve hot read endpoints from the Redis response cache with conditional-GET support."""
+    path = request.url.path
+    
+    if request.method != "GET":
+        response = await call_next(request)
+        # Any successful write to CVEs makes every cached read potentially stale
+        if request.method in ("POST", "PUT", "DELETE") and path.startswith("/api/v1/cves") and response.status_code < 400:
+            await cache_manager.invalidate()
+        return response
+    
+    ttl = get_cache_ttl(path)
+    if ttl is None:
+        return await call_next(request)
+    
+    if_none_match = request.headers.get("if-none-match")
+    cache_key = build_cache_key(path, request.query_params)
+    cached = await cache_manager.get_response(cache_key)
+    if cached:
+        return _build_cached_response(cached, ttl, "HIT", if_none_match)
+    
+    async def render() -> dict:
+        response = await call_next(request)
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        entry = {
+            "body": body,
+            "status_code": response.status_code,
+            "media_type": response.headers.get("content-type", "application/json"),
+            "etag": compute_etag(body),
+            # Replayed on every hit; length and encoding are recomputed per response
+            "headers": {
+                name: value for name, value in response.headers.items()
+                if name not in UNCACHED_RESPONSE_HEADERS
+            },
+        }
+        if response.status_code in (200, 404):
+            # Cache misses for unknown CVEs only briefly so newly synced records show up quickly
+            await cache_manager.set_response(
+                cache_key,
+                body,
+                entry["status_code"],
+                entry["media_type"],
+                entry["etag"],
+                ttl if response.status_code == 200 else settings.cache_ttl_short,
+                entry["headers"]
+            )
+        return entry
+    
+    # Concurrent identical misses share a single render instead of each hitting Supabase
+    entry = await cache_manager.single_flight(cache_key, render)
+    return _build_cached_response(entry, ttl, "MISS", if_none_match)
+
+
+def _build_cached_response(entry: dict, ttl: int, cache_state: str, if_none_match: Optional[str]) -> Response:
+    """Build a response from a cache entry, answering 304 when the client's ETag matches."""
+    headers = {**entry.get("headers", {}), "X-Cache": cache_state}
+    if entry["status_code"] == 200:
+        headers["ETag"] = entry["etag"]
+        headers["Cache-Control"] = f"public, max-age={ttl}"
+        if if_none_match == entry["etag"]:
+            return Response(status_code=304, headers=headers)
+    return Response(
+        content=entry["body"],
+        status_code=entry["status_code"],
+        media_type=entry["media_type"],
+        headers=headers
     )
 
 
 @app.middleware("http")
 async def logging_middleware(request: Request, call_next):
     """Request/response logging middleware."""
-    start_time = time.time()
+    if not _info_enabled:
+        return await call_next(request)
     
-    # Log request
-    logger.info(
-        "Request started",
-        method=request.method,
-        path=request.url.path,
-        query_params=str(request.query_params)
-    )
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
     
     # Process request
     response = await call_next(request)
     
-    # Log response
-    process_time = time.time() - start_time
+    # Log a single record per request once the response is ready
     logger.info(
         "Request completed",
         method=request.method,
         path=request.url.path,
+        query_params=str(request.query_params),
         status_code=response.status_code,
-        process_time=round(process_time, 4)
+        process_time_us=int((loop.time() - start_time) * 1_000_000)
     )
     
     return response
 
 
+# Compress large responses. Added after the response cache middleware so it wraps it,
+# which keeps cached bodies uncompressed and lets each client negotiate encoding.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# Add CORS middleware last so it is outermost: every response, including ones the
+# cache middleware rebuilds, gets CORS headers, and preflights never reach the cache.
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.allowed_origins,
+    allow_credentials=True,
+    allow_methods=settings.allowed_methods,
+    allow_headers=settings.allowed_headers,
+)
+
+
 # Required imports
 from datetime import datetime
-import time
 
 
 if __name__ == "__main__":
@@ -278,5 +431,9 @@ if __name__ == "__main__":
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
-        log_level=settings.log_level.lower()
+        log_level=settings.log_level.lower(),
+        loop="uvloop",
+        http="httptools",
+        log_config=None,
+        access_log=False  # logging_middleware already logs every request
     )
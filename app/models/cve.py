@@ -2,10 +2,46 @@
 Pydantic models for CVE data structures.
 """
 from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field, field_validator, ValidationInfo
+from functools import partial
+from typing import Optional, List, Dict, Any, Literal, Annotated
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, field_validator, ValidationInfo
 from decimal import Decimal
 
+import msgspec
+
+# CVE identifier format, shared by model schemas and path validation
+CVE_ID_PATTERN = r"^CVE-\d{4}-\d{4,}$"
+
+
+def _upper_if_str(value: Any) -> Any:
+    """Upper-case string input so case-insensitive query values match upper-case literals."""
+    return value.upper() if isinstance(value, str) else value
+
+
+# Closed value sets, validated by Pydantic as literal membership checks
+CVSSSeverity = Annotated[
+    Literal["CRITICAL", "HIGH", "MEDIUM", "LOW", "NONE"], BeforeValidator(_upper_if_str)
+]
+CVESortField = Literal["last_modified", "published", "cve_id", "cvss_v3_score", "cvss_v2_score"]
+SortOrder = Literal["asc", "desc"]
+
+
+def normalize_cve_id(cve_id: str) -> str:
+    """Upper-case a CVE ID, skipping the string copy when it already is."""
+    return cve_id if cve_id.isupper() else cve_id.upper()
+
+
+def is_valid_cve_id(cve_id: str) -> bool:
+    """Check a CVE ID against CVE_ID_PATTERN (case-insensitively) without the regex engine."""
+    return (
+        len(cve_id) >= 13
+        and cve_id.isascii()
+        and cve_id[:4].upper() == "CVE-"
+        and cve_id[4:8].isdigit()
+        and cve_id[8] == "-"
+        and cve_id[9:].isdigit()
+    )
+
 
 class CVSSMetric(BaseModel):
     """CVSS metric information."""
@@ -16,8 +52,7 @@ class CVSSMetric(BaseModel):
     exploitability_score: Optional[float] = None
     impact_score: Optional[float] = None
     
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 class CPEMatch(BaseModel):
@@ -29,8 +64,7 @@ class CPEMatch(BaseModel):
     version_end_excluding: Optional[str] = None
     version_end_including: Optional[str] = None
     
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 class Node(BaseModel):
@@ -39,16 +73,14 @@ class Node(BaseModel):
     negate: Optional[bool] = False
     cpe_match: List[CPEMatch] = []
     
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 class Configuration(BaseModel):
     """CVE configuration containing affected systems."""
     nodes: List[Node] = []
     
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 class Reference(BaseModel):
@@ -57,8 +89,7 @@ class Reference(BaseModel):
     source: Optional[str] = None
     tags: List[str] = []
     
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 class WeaknessDescription(BaseModel):
@@ -73,8 +104,7 @@ class Weakness(BaseModel):
     type: str
     description: List[WeaknessDescription]
     
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 class VendorComment(BaseModel):
@@ -92,7 +122,7 @@ class CVEDescription(BaseModel):
 
 class CVEBase(BaseModel):
     """Base CVE model with common fields."""
-    cve_id: str = Field(..., pattern=r"^CVE-\d{4}-\d{4,}$")
+    cve_id: str = Field(..., json_schema_extra={"pattern": CVE_ID_PATTERN})
     source_identifier: Optional[str] = None
     vuln_status: Optional[str] = None
     published: Optional[datetime] = None
@@ -101,22 +131,24 @@ class CVEBase(BaseModel):
     
     @field_validator('cve_id')
     def validate_cve_id(cls, v):
-        if not v.startswith('CVE-'):
-            raise ValueError('CVE ID must start with "CVE-"')
-        return v.upper()
+        if not is_valid_cve_id(v):
+            raise ValueError('CVE ID must match the format CVE-YYYY-NNNN')
+        # Past the prefix a valid ID is digits and hyphens, so an upper-case prefix means nothing to upper-case
+        return v if v.startswith('CVE-') else v.upper()
 
 
 class CVECreate(CVEBase):
     """Model for creating a new CVE record."""
-    cvss_v2_score: Optional[Decimal] = Field(None, ge=0, le=10)
-    cvss_v3_score: Optional[Decimal] = Field(None, ge=0, le=10)
+    cvss_v2_score: Optional[float] = Field(None, ge=0, le=10)
+    cvss_v3_score: Optional[float] = Field(None, ge=0, le=10)
     cvss_v2_vector: Optional[str] = None
     cvss_v3_vector: Optional[str] = None
     cvss_v2_severity: Optional[str] = None
     cvss_v3_severity: Optional[str] = None
     description: Optional[str] = None
     cpe_configurations: Optional[List[Dict[str, Any]]] = None
-    references: Optional[List[Dict[str, Any]]] = None
+    # Stored in the cve_references column; dump with by_alias=True to build rows
+    references: Optional[List[Dict[str, Any]]] = Field(None, serialization_alias="cve_references")
     weaknesses: Optional[List[Dict[str, Any]]] = None
     configurations: Optional[List[Dict[str, Any]]] = None
     raw_data: Optional[Dict[str, Any]] = None
@@ -129,14 +161,15 @@ class CVEUpdate(BaseModel):
     published: Optional[datetime] = None
     last_modified: Optional[datetime] = None
     description: Optional[str] = None
-    cvss_v2_score: Optional[Decimal] = Field(None, ge=0, le=10)
-    cvss_v3_score: Optional[Decimal] = Field(None, ge=0, le=10)
+    cvss_v2_score: Optional[float] = Field(None, ge=0, le=10)
+    cvss_v3_score: Optional[float] = Field(None, ge=0, le=10)
     cvss_v2_vector: Optional[str] = None
     cvss_v3_vector: Optional[str] = None
     cvss_v2_severity: Optional[str] = None
     cvss_v3_severity: Optional[str] = None
     cpe_configurations: Optional[List[Dict[str, Any]]] = None
-    references: Optional[List[Dict[str, Any]]] = None
+    # Stored in the cve_references column; dump with by_alias=True to build rows
+    references: Optional[List[Dict[str, Any]]] = Field(None, serialization_alias="cve_references")
     weaknesses: Optional[List[Dict[str, Any]]] = None
     configurations: Optional[List[Dict[str, Any]]] = None
     raw_data: Optional[Dict[str, Any]] = None
@@ -152,15 +185,81 @@ class CVEResponse(CVEBase):
     cvss_v3_vector: Optional[str] = None
     cvss_v2_severity: Optional[str] = None
     cvss_v3_severity: Optional[str] = None
+    # Configurations stay untyped: NVD nodes use "cpeMatch", which Node does not model
+    cpe_configurations: Optional[List[Dict[str, Any]]] = None
+    references: Optional[List[Reference]] = None
+    weaknesses: Optional[List[Weakness]] = None
+    configurations: Optional[List[Dict[str, Any]]] = None
+    created_at: datetime
+    updated_at: datetime
+    
+    model_config = ConfigDict(frozen=True, from_attributes=True)
+
+
+class CVERecord(msgspec.Struct, kw_only=True):
+    """
+    CVE record for hot list serialization paths.
+    
+    Mirrors CVEResponse field-for-field but is built and encoded with msgspec,
+    skipping Pydantic validation and model_dump on large result sets.
+    """
+    cve_id: str
+    source_identifier: Optional[str] = None
+    vuln_status: Optional[str] = None
+    published: Optional[datetime] = None
+    last_modified: Optional[datetime] = None
+    descriptions: List[Dict[str, Any]] = []
+    id: int
+    description: Optional[str] = None
+    cvss_v2_score: Optional[Decimal] = None
+    cvss_v3_score: Optional[Decimal] = None
+    cvss_v2_vector: Optional[str] = None
+    cvss_v3_vector: Optional[str] = None
+    cvss_v2_severity: Optional[str] = None
+    cvss_v3_severity: Optional[str] = None
     cpe_configurations: Optional[List[Dict[str, Any]]] = None
     references: Optional[List[Dict[str, Any]]] = None
     weaknesses: Optional[List[Dict[str, Any]]] = None
     configurations: Optional[List[Dict[str, Any]]] = None
     created_at: datetime
     updated_at: datetime
+
+
+class CVEListPage(msgspec.Struct):
+    """msgspec counterpart of CVEListResponse for the list endpoint."""
+    items: List[CVERecord]
+    total: int
+    page: int
+    size: int
+    has_next: bool
+    has_prev: bool
+
+
+class CVEIngestRow(msgspec.Struct, kw_only=True):
+    """
+    cves row built from an NVD item on the sync ingest path.
     
-    class Config:
-        from_attributes = True
+    Carries the same columns CVECreate dumps to, but is checked with
+    msgspec.convert and serialized with msgspec.to_builtins, keeping Pydantic
+    validation and model_dump off the per-CVE hot loop.
+    """
+    cve_id: str
+    source_identifier: Optional[str] = None
+    vuln_status: Optional[str] = None
+    published: Optional[datetime] = None
+    last_modified: Optional[datetime] = None
+    description: Optional[str] = None
+    cvss_v2_score: Optional[Annotated[float, msgspec.Meta(ge=0, le=10)]] = None
+    cvss_v3_score: Optional[Annotated[float, msgspec.Meta(ge=0, le=10)]] = None
+    cvss_v2_vector: Optional[str] = None
+    cvss_v3_vector: Optional[str] = None
+    cvss_v2_severity: Optional[str] = None
+    cvss_v3_severity: Optional[str] = None
+    cpe_configurations: Optional[List[Dict[str, Any]]] = None
+    cve_references: Optional[List[Dict[str, Any]]] = None
+    weaknesses: Optional[List[Dict[str, Any]]] = None
+    configurations: Optional[List[Dict[str, Any]]] = None
+    raw_data: Optional[Dict[str, Any]] = None
 
 
 class CVEListResponse(BaseModel):
@@ -171,6 +270,16 @@ class CVEListResponse(BaseModel):
     size: int
     has_next: bool
     has_prev: bool
+    
+    model_config = ConfigDict(frozen=True)
+
+
+class CVESearchResponse(BaseModel):
+    """Model for cursor-paginated CVE search responses."""
+    items: List[CVEResponse]
+    next_cursor: Optional[str] = None
+    
+    model_config = ConfigDict(frozen=True)
 
 
 class CVEFilters(BaseModel):
@@ -179,13 +288,13 @@ class CVEFilters(BaseModel):
     year: Optional[int] = Field(None, ge=1999, le=2030)
     min_score: Optional[float] = Field(None, ge=0, le=10)
     max_score: Optional[float] = Field(None, ge=0, le=10)
-    severity: Optional[str] = None
+    severity: Optional[CVSSSeverity] = None
     vuln_status: Optional[str] = None
     modified_since: Optional[datetime] = None
     published_since: Optional[datetime] = None
     keyword: Optional[str] = None
-    sort: Optional[str] = "last_modified"
-    order: Optional[str] = "desc"
+    sort: CVESortField = "last_modified"
+    order: SortOrder = "desc"
     
     @field_validator('max_score')
     def validate_score_range(cls, v, info: ValidationInfo):
@@ -198,8 +307,9 @@ class CVEFilters(BaseModel):
 class SyncStatus(BaseModel):
     """Model for synchronization status."""
     id: int
-    sync_type: str
-    status: str
+    # "initial" is the placeholder row seeded by database/supabase-schema.sql
+    sync_type: Literal["full", "incremental", "initial"]
+    status: Literal["pending", "running", "completed", "failed", "cancelled"]
     started_at: datetime
     completed_at: Optional[datetime] = None
     total_records: int = 0
@@ -209,13 +319,12 @@ class SyncStatus(BaseModel):
     error_message: Optional[str] = None
     last_modified_date: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class SyncTrigger(BaseModel):
     """Model for triggering synchronization."""
-    sync_type: str = Field("incremental", pattern="^(full|incremental)$")
+    sync_type: Literal["full", "incremental"] = "incremental"
     force: bool = False
 
 
@@ -245,24 +354,23 @@ class CVEYearlyStats(BaseModel):
 
 class HealthCheck(BaseModel):
     """Model for health check responses."""
-    status: str
+    status: Literal["healthy", "unhealthy"]
     timestamp: datetime
     database_connected: bool
     last_sync: Optional[datetime] = None
     total_cves: int = 0
     version: str = "1.0.0"
+    
+    model_config = ConfigDict(frozen=True)
 
 
 class ErrorResponse(BaseModel):
     """Model for error responses."""
     detail: str
     code: Optional[str] = None
-    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: datetime = Field(default_factory=partial(datetime.now, timezone.utc))
     
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    model_config = ConfigDict(frozen=True)
 
 
 # NVD API Response Models
@@ -270,8 +378,7 @@ class NVDCVEItem(BaseModel):
     """Model for individual CVE item from NVD API."""
     cve: Dict[str, Any]
     
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 class NVDResponse(BaseModel):
@@ -284,6 +391,19 @@ class NVDResponse(BaseModel):
     timestamp: datetime
     vulnerabilities: List[NVDCVEItem] = []
     
-    class Config:
-        populate_by_name = True
-        extra = "allow"
+    model_config = ConfigDict(populate_by_name=True, extra="allow")
+
+
+class NVDVulnerability(msgspec.Struct):
+    """msgspec counterpart of NVDCVEItem for the bulk ingest path."""
+    cve: Dict[str, Any]
+
+
+class NVDPage(msgspec.Struct):
+    """
+    The parts of an NVD response page bulk ingest reads, decoded with msgspec.
+    
+    Other response fields are skipped by the decoder rather than materialized.
+    """
+    total_results: int = msgspec.field(name="totalResults")
+    vulnerabilities: List[NVDVulnerability] = []
@@ -2,54 +2,129 @@
 CVE service for data processing, validation, and database operations.
 """
 import asyncio
+import base64
 import json
 from datetime import datetime, timedelta, timezone
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, Union, AsyncGenerator, Callable, get_args
 from decimal import Decimal
+from functools import lru_cache
 
+import msgspec
+import orjson
 import structlog
+from postgrest.exceptions import APIError
 
-from app.core.database import db_manager
+from app.core.cache import CACHE_PREFIX, cache_manager
+from app.core.config import settings
+from app.core.database import db_manager, returning_columns
 from app.models.cve import (
     CVECreate, CVEUpdate, CVEResponse, CVEFilters, 
-    CVEListResponse, CVEStatistics, NVDCVEItem
+    CVEStatistics, NVDCVEItem, NVDVulnerability, CVERecord, CVEListPage, CVESortField,
+    CVEIngestRow, is_valid_cve_id
 )
 
 logger = structlog.get_logger(__name__)
 
 
+@lru_cache(maxsize=8192)
+def parse_iso_datetime(date_str: str) -> datetime:
+    """
+    Parse an ISO 8601 timestamp as a timezone-aware datetime, treating naive values as UTC.
+    
+    Cached because NVD feeds repeat the same lastModified values across many CVEs.
+    """
+    if date_str[-1] == 'Z':
+        date_str = date_str[:-1] + '+00:00'
+    dt = datetime.fromisoformat(date_str)
+    return dt if dt.tzinfo is not None else dt.replace(tzinfo=timezone.utc)
+
+# CVEFilters field -> (cves column, PostgREST filter operator)
+FILTER_COLUMNS: Dict[str, Tuple[str, str]] = {
+    "cve_id": ("cve_id", "eq"),
+    "year": ("published_year", "eq"),
+    "min_score": ("cvss_v3_score", "gte"),
+    "max_score": ("cvss_v3_score", "lte"),
+    "severity": ("cvss_v3_severity", "eq"),
+    "vuln_status": ("vuln_status", "eq"),
+    "modified_since": ("last_modified", "gte"),
+    "published_since": ("published", "gte"),
+    "keyword": ("description_tsv", "wfts(english)"),
+}
+
+# (score, vector, severity) extracted from one NVD CVSS metric
+CVSSFields = Tuple[Optional[float], Optional[str], Optional[str]]
+
+# Cache key for get_statistics; under CACHE_PREFIX so CVE writes invalidate it
+STATISTICS_CACHE_KEY = f"{CACHE_PREFIX}stats"
+
+# CVE IDs per IN (...) lookup, keeping the PostgREST query string short
+EXISTING_LOOKUP_CHUNK_SIZE = 200
+
+# Rows per bulk upsert request; a batch's chunks are written concurrently
+UPSERT_CHUNK_SIZE = 250
+
+# Bulk upsert requests in flight per service, across all concurrent batches
+UPSERT_CONCURRENCY = 8
+
+# Concurrent single-row upserts when a bulk upsert chunk is rejected
+UPSERT_FALLBACK_CONCURRENCY = 16
+
+# Rows per request when streaming unbounded result sets; matches PostgREST's default max-rows
+STREAM_PAGE_SIZE = 1000
+
+# Failed CVEs included in the single error record logged for a batch
+BATCH_ERROR_SAMPLE_SIZE = 5
+
+# Columns the CVE list may be sorted by; also guards the sort column interpolated into SQL
+SORT_FIELDS = frozenset(get_args(CVESortField))
+
+# PostgREST filter operator -> SQL condition template for the direct Postgres read path
+SQL_OPERATORS: Dict[str, str] = {
+    "eq": "{column} = ${param}",
+    "gte": "{column} >= ${param}",
+    "lte": "{column} <= ${param}",
+    "wfts(english)": "{column} @@ websearch_to_tsquery('english', ${param})",
+}
+
+# Columns read by _row_to_cve_response and _row_to_cve_record
+CVE_RESPONSE_COLUMNS = (
+    "id", "cve_id", "source_identifier", "vuln_status", "published", "last_modified",
+    "description", "cvss_v2_score", "cvss_v3_score", "cvss_v2_vector", "cvss_v3_vector",
+    "cvss_v2_severity", "cvss_v3_severity", "cpe_configurations", "cve_references",
+    "weaknesses", "configurations", "created_at", "updated_at",
+)
+CVE_RESPONSE_SELECT = ", ".join(CVE_RESPONSE_COLUMNS)
+
+
+def _log_batch_errors(message: str, errors: List[Tuple[str, Exception]]) -> None:
+    """Log the failures of a batch as one record with a count and a small sample."""
+    if errors:
+        logger.error(
+            message,
+            count=len(errors),
+            sample=[(cve_id, str(e)) for cve_id, e in errors[:BATCH_ERROR_SAMPLE_SIZE]],
+        )
+
+
 class CVEService:
     """Service for managing CVE data operations."""
     
     def __init__(self):
         self.batch_size = 1000
+        # Hot single-CVE reads; the Redis response cache sits behind this one
+        self._cve_cache = cache_manager.local_cache(settings.cve_cache_size, settings.cve_cache_ttl)
+        # Shared by every batch being upserted, so concurrent sync workers stay
+        # within the PostgREST connection pool
+        self._upsert_slots = asyncio.Semaphore(UPSERT_CONCURRENCY)
     
     async def create_cve(self, cve_data: CVECreate) -> CVEResponse:
         """Create a new CVE record using Supabase client."""
+        self._cve_cache.pop(cve_data.cve_id)
         try:
-            # Prepare data for Supabase insert
-            insert_data = {
-                "cve_id": cve_data.cve_id,
-                "source_identifier": cve_data.source_identifier,
-                "vuln_status": cve_data.vuln_status,
-                "published": cve_data.published.isoformat() if cve_data.published else None,
-                "last_modified": cve_data.last_modified.isoformat() if cve_data.last_modified else None,
-                "description": cve_data.description,
-                "cvss_v2_score": float(cve_data.cvss_v2_score) if cve_data.cvss_v2_score else None,
-                "cvss_v3_score": float(cve_data.cvss_v3_score) if cve_data.cvss_v3_score else None,
-                "cvss_v2_vector": cve_data.cvss_v2_vector,
-                "cvss_v3_vector": cve_data.cvss_v3_vector,
-                "cvss_v2_severity": cve_data.cvss_v2_severity,
-                "cvss_v3_severity": cve_data.cvss_v3_severity,
-                "cpe_configurations": cve_data.cpe_configurations,
-                "cve_references": cve_data.references,
-                "weaknesses": cve_data.weaknesses,
-                "configurations": cve_data.configurations,
-                "raw_data": cve_data.raw_data
-            }
+            insert_data = self._cve_to_row(cve_data)
             
             # Insert using Supabase client
-            result = db_manager.supabase.table("cves").insert(insert_data).execute()
+            result = await asyncio.to_thread(db_manager.supabase.table("cves").insert(insert_data).execute)
             
             if result.data:
                 return self._row_to_cve_response(result.data[0])
@@ -65,19 +140,10 @@ class CVEService:
     
     async def update_cve(self, cve_id: str, cve_data: CVEUpdate) -> Optional[CVEResponse]:
         """Update an existing CVE record using Supabase."""
+        self._cve_cache.pop(cve_id)
         try:
             # Build update data based on provided fields
-            update_data = {}
-            
-            for field, value in cve_data.dict(exclude_unset=True).items():
-                # Convert datetime and Decimal objects for JSON serialization
-                if isinstance(value, datetime):
-                    update_data[field] = value.isoformat()
-                elif isinstance(value, Decimal):
-                    # Convert Decimal to float for JSON serialization
-                    update_data[field] = float(value)
-                else:
-                    update_data[field] = value
+            update_data = cve_data.model_dump(mode='json', exclude_unset=True, by_alias=True)
             
             if not update_data:
                 # No fields to update
@@ -87,7 +153,7 @@ class CVEService:
             update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
             
             # Update using Supabase
-            result = db_manager.supabase.table("cves").update(update_data).eq("cve_id", cve_id).execute()
+            result = await asyncio.to_thread(db_manager.supabase.table("cves").update(update_data).eq("cve_id", cve_id).execute)
             
             if result.data:
                 return self._row_to_cve_response(result.data[0])
@@ -98,12 +164,22 @@ class CVEService:
             return None
     
     async def get_cve_by_id(self, cve_id: str) -> Optional[CVEResponse]:
-        """Get a CVE by its ID using Supabase client."""
+        """
+        Get a CVE by its ID using Supabase client.
+        
+        Found CVEs are kept in a per-process LRU for cve_cache_ttl seconds; CVEResponse
+        is frozen, so cached instances are safe to share between requests.
+        """
+        cached = self._cve_cache.get(cve_id)
+        if cached is not None:
+            return cached
         try:
-            result = db_manager.supabase.table("cves").select("*").eq("cve_id", cve_id).execute()
+            result = await asyncio.to_thread(db_manager.supabase.table("cves").select(*CVE_RESPONSE_COLUMNS).eq("cve_id", cve_id).execute)
             
             if result.data and len(result.data) > 0:
-                return self._row_to_cve_response(result.data[0])
+                cve = self._row_to_cve_response(result.data[0])
+                self._cve_cache.set(cve_id, cve)
+                return cve
             return None
         except Exception as e:
             logger.error(f"Error fetching CVE {cve_id}", error=str(e))
@@ -114,48 +190,22 @@ class CVEService:
         filters: CVEFilters, 
         page: int = 1, 
         size: int = 20
-    ) -> CVEListResponse:
+    ) -> CVEListPage:
         """Get CVEs with filtering and pagination using Supabase."""
+        if db_manager.pg_pool is not None:
+            return await self._get_cves_pg(filters, page, size)
+        
         try:
-            # Start with base query
-            query = db_manager.supabase.table("cves").select("*")
-            
-            # Apply filters
-            if filters.cve_id:
-                query = query.eq("cve_id", filters.cve_id)
-            
-            if filters.year:
-                # Note: This might need adjustment based on how dates are stored
-                start_date = f"{filters.year}-01-01"
-                end_date = f"{filters.year}-12-31"
-                query = query.gte("published", start_date).lte("published", end_date)
-            
-            if filters.min_score is not None:
-                # Simple filter on CVSS v3 score (can be enhanced later)
-                query = query.gte("cvss_v3_score", filters.min_score)
-            
-            if filters.max_score is not None:
-                query = query.lte("cvss_v3_score", filters.max_score)
-            
-            if filters.severity:
-                query = query.eq("cvss_v3_severity", filters.severity.upper())
-            
-            if filters.vuln_status:
-                query = query.eq("vuln_status", filters.vuln_status)
-            
-            if filters.modified_since:
-                query = query.gte("last_modified", filters.modified_since.isoformat())
-            
-            if filters.published_since:
-                query = query.gte("published", filters.published_since.isoformat())
-            
-            if filters.keyword:
-                # Simple text search in description
-                query = query.ilike("description", f"%{filters.keyword}%")
+            # Filters, sort, pagination and the count all go out in one query. Only the
+            # first page pays for an exact count; later pages use PostgREST's estimate,
+            # which is still exact for result sets below the planner threshold.
+            count_method = "exact" if page == 1 else "estimated"
+            query = db_manager.supabase.table("cves").select(*CVE_RESPONSE_COLUMNS, count=count_method)
+            query = self._apply_filters(query, filters)
             
             # Apply sorting
-            sort_field = filters.sort or "last_modified"
-            sort_desc = (filters.order or "desc").lower() == "desc"
+            sort_field = filters.sort if filters.sort in SORT_FIELDS else "last_modified"
+            sort_desc = filters.order == "desc"
             query = query.order(sort_field, desc=sort_desc)
             
             # Apply pagination
@@ -163,16 +213,13 @@ class CVEService:
             query = query.range(offset, offset + size - 1)
             
             # Execute query
-            result = query.execute()
+            result = await asyncio.to_thread(query.execute)
             
             # Convert to response objects
-            items = [self._row_to_cve_response(row) for row in result.data] if result.data else []
-            
-            # Get total count for pagination (simplified - could be optimized)
-            count_result = db_manager.supabase.table("cves").select("count", count="exact").execute()
-            total = count_result.count if count_result.count is not None else 0
+            items = [self._row_to_cve_record(row) for row in result.data] if result.data else []
+            total = result.count if result.count is not None else 0
             
-            return CVEListResponse(
+            return CVEListPage(
                 items=items,
                 total=total,
                 page=page,
@@ -182,7 +229,7 @@ class CVEService:
             )
         except Exception as e:
             logger.error("Error fetching CVEs", error=str(e))
-            return CVEListResponse(
+            return CVEListPage(
                 items=[],
                 total=0,
                 page=page,
@@ -191,86 +238,242 @@ class CVEService:
                 has_prev=False
             )
     
-    async def get_cves_by_year(self, year: int) -> List[CVEResponse]:
-        """Get all CVEs published in a specific year using Supabase."""
+    async def _get_cves_pg(self, filters: CVEFilters, page: int, size: int) -> CVEListPage:
+        """Get a CVE page and its total count in one query on the direct Postgres pool."""
         try:
-            start_date = f"{year}-01-01"
-            end_date = f"{year}-12-31"
+            where, params = self._build_where_clause(filters)
+            sort_field = filters.sort if filters.sort in SORT_FIELDS else "last_modified"
+            sort_dir = "DESC" if filters.order == "desc" else "ASC"
+            offset = (page - 1) * size
             
-            result = db_manager.supabase.table("cves").select("*").gte("published", start_date).lte("published", end_date).order("published", desc=True).execute()
+            sql = (
+                f"SELECT {CVE_RESPONSE_SELECT}, count(*) OVER () AS total_count FROM cves{where} "
+                f"ORDER BY {sort_field} {sort_dir} NULLS LAST "
+                f"LIMIT ${len(params) + 1} OFFSET ${len(params) + 2}"
+            )
+            async with db_manager.pg_pool.acquire() as conn:
+                rows = await conn.fetch(sql, *params, size, offset)
+                if rows:
+                    total = rows[0]["total_count"]
+                else:
+                    # Past the last page the window count is unavailable
+                    total = await conn.fetchval(f"SELECT count(*) FROM cves{where}", *params)
             
-            return [self._row_to_cve_response(row) for row in result.data] if result.data else []
+            return CVEListPage(
+                items=[self._row_to_cve_record(dict(row)) for row in rows],
+                total=total,
+                page=page,
+                size=size,
+                has_next=(page * size) < total,
+                has_prev=page > 1
+            )
         except Exception as e:
-            logger.error(f"Error fetching CVEs for year {year}", error=str(e))
-            return []
+            logger.error("Error fetching CVEs", error=str(e))
+            return CVEListPage(
+                items=[],
+                total=0,
+                page=page,
+                size=size,
+                has_next=False,
+                has_prev=False
+            )
+    
+    def _build_where_clause(self, filters: CVEFilters) -> Tuple[str, List[Any]]:
+        """Build a parameterized SQL WHERE clause from CVEFilters."""
+        conditions = []
+        params: List[Any] = []
+        
+        for field, (column, operator) in FILTER_COLUMNS.items():
+            value = getattr(filters, field)
+            if value is None or value == "":
+                continue
+            
+            if field in ("min_score", "max_score"):
+                value = Decimal(str(value))
+            
+            params.append(value)
+            conditions.append(SQL_OPERATORS[operator].format(column=column, param=len(params)))
+        
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, params
+    
+    def _apply_filters(self, query, filters: CVEFilters):
+        """Chain CVEFilters onto a PostgREST query as server-side filters."""
+        for field, (column, operator) in FILTER_COLUMNS.items():
+            value = getattr(filters, field)
+            if value is None or value == "":
+                continue
+            
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            
+            query = query.filter(column, operator, value)
+        
+        return query
     
-    async def get_cves_by_score_range(
+    def get_cves_by_year(self, year: int) -> AsyncGenerator[List[CVERecord], None]:
+        """Stream all CVEs published in a specific year, a page at a time, using Supabase."""
+        return self._stream_cve_pages(
+            lambda: db_manager.supabase.table("cves").select(*CVE_RESPONSE_COLUMNS).eq("published_year", year).order("published", desc=True),
+            f"CVEs for year {year}"
+        )
+    
+    def get_cves_by_score_range(
         self, 
         min_score: float, 
         max_score: float
-    ) -> List[CVEResponse]:
-        """Get CVEs within a CVSS score range using Supabase."""
+    ) -> AsyncGenerator[List[CVERecord], None]:
+        """Stream CVEs within a CVSS score range, a page at a time, using Supabase."""
+        # Query for CVEs with v3 scores in range
+        return self._stream_cve_pages(
+            lambda: db_manager.supabase.table("cves").select(*CVE_RESPONSE_COLUMNS).gte("cvss_v3_score", min_score).lte("cvss_v3_score", max_score).order("cvss_v3_score", desc=True),
+            f"CVEs by score range {min_score}-{max_score}"
+        )
+    
+    def get_recent_cves(self, days: int) -> AsyncGenerator[List[CVERecord], None]:
+        """Stream CVEs modified in the last N days, a page at a time, using Supabase."""
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
+        return self._stream_cve_pages(
+            lambda: db_manager.supabase.table("cves").select(*CVE_RESPONSE_COLUMNS).gte("last_modified", cutoff_date.isoformat()).order("last_modified", desc=True),
+            f"recent CVEs for {days} days"
+        )
+    
+    async def _stream_cve_pages(
+        self,
+        build_query: Callable[[], Any],
+        description: str
+    ) -> AsyncGenerator[List[CVERecord], None]:
+        """
+        Yield the rows of an ordered query as CVERecord pages of STREAM_PAGE_SIZE.
+        
+        Only one page is held at a time. Errors are logged and re-raised, so the
+        caller can fail the response instead of ending it early.
+        """
+        offset = 0
         try:
-            # Query for CVEs with v3 scores in range
-            result = db_manager.supabase.table("cves").select("*").gte("cvss_v3_score", min_score).lte("cvss_v3_score", max_score).order("cvss_v3_score", desc=True).execute()
-            
-            return [self._row_to_cve_response(row) for row in result.data] if result.data else []
+            while True:
+                query = build_query().range(offset, offset + STREAM_PAGE_SIZE - 1)
+                result = await asyncio.to_thread(query.execute)
+                rows = result.data or []
+                if rows:
+                    yield [self._row_to_cve_record(row) for row in rows]
+                if len(rows) < STREAM_PAGE_SIZE:
+                    return
+                offset += STREAM_PAGE_SIZE
         except Exception as e:
-            logger.error(f"Error fetching CVEs by score range {min_score}-{max_score}", error=str(e))
-            return []
+            logger.error(f"Error fetching {description}", error=str(e))
+            raise
     
-    async def get_recent_cves(self, days: int) -> List[CVEResponse]:
-        """Get CVEs modified in the last N days using Supabase."""
+    async def search_cves(
+        self,
+        search_term: str,
+        limit: int = 20,
+        after: Optional[str] = None
+    ) -> Tuple[List[CVERecord], Optional[str]]:
+        """
+        Full-text search for CVEs ranked by relevance using the description_tsv GIN index.
+        
+        Pages are keyed on (rank, cve_id) rather than an offset. Returns the page items
+        and the cursor for the next page, or None when this is the last page.
+        Raises ValueError for a malformed cursor.
+        """
+        after_rank, after_cve_id = self._decode_search_cursor(after) if after else (None, None)
+        
+        if db_manager.pg_pool is not None:
+            return await self._search_cves_pg(search_term, limit, after_rank, after_cve_id)
+        
         try:
-            cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
-            
-            result = db_manager.supabase.table("cves").select("*").gte("last_modified", cutoff_date.isoformat()).order("last_modified", desc=True).execute()
-            
-            return [self._row_to_cve_response(row) for row in result.data] if result.data else []
+            query = db_manager.supabase.rpc(
+                "search_cves_fts",
+                {
+                    "search_term": search_term,
+                    "result_limit": limit,
+                    "after_rank": after_rank,
+                    "after_cve_id": after_cve_id
+                }
+            )
+            result = await asyncio.to_thread(query.execute)
+            
+            rows = result.data or []
+            items = [self._row_to_cve_record(row) for row in rows]
+            next_cursor = None
+            if len(rows) == limit:
+                next_cursor = self._encode_search_cursor(rows[-1]["rank"], rows[-1]["cve_id"])
+            return items, next_cursor
         except Exception as e:
-            logger.error(f"Error fetching recent CVEs for {days} days", error=str(e))
-            return []
+            logger.error(f"Error searching CVEs for term '{search_term}'", error=str(e))
+            return [], None
     
-    async def search_cves(self, search_term: str, limit: int = 100) -> List[CVEResponse]:
-        """Full-text search for CVEs using Supabase."""
+    async def _search_cves_pg(
+        self,
+        search_term: str,
+        limit: int,
+        after_rank: Optional[float],
+        after_cve_id: Optional[str]
+    ) -> Tuple[List[CVERecord], Optional[str]]:
+        """Run search_cves_fts on the direct Postgres pool."""
         try:
-            # Simple text search in description field
-            result = db_manager.supabase.table("cves").select("*").ilike("description", f"%{search_term}%").limit(limit).order("last_modified", desc=True).execute()
+            rows = await db_manager.pg_pool.fetch(
+                "SELECT * FROM search_cves_fts($1, $2, $3, $4)",
+                search_term, limit, after_rank, after_cve_id
+            )
             
-            return [self._row_to_cve_response(row) for row in result.data] if result.data else []
+            items = [self._row_to_cve_record(dict(row)) for row in rows]
+            next_cursor = None
+            if len(rows) == limit:
+                next_cursor = self._encode_search_cursor(rows[-1]["rank"], rows[-1]["cve_id"])
+            return items, next_cursor
         except Exception as e:
             logger.error(f"Error searching CVEs for term '{search_term}'", error=str(e))
-            return []
+            return [], None
+    
+    def _encode_search_cursor(self, rank: float, cve_id: str) -> str:
+        """Encode the last (rank, cve_id) of a search page as an opaque cursor."""
+        return base64.urlsafe_b64encode(f"{rank}|{cve_id}".encode()).decode()
+    
+    def _decode_search_cursor(self, cursor: str) -> Tuple[float, str]:
+        """Decode a search cursor into (rank, cve_id)."""
+        try:
+            rank, cve_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+            return float(rank), cve_id
+        except (ValueError, UnicodeDecodeError):
+            raise ValueError("Invalid search cursor")
     
     async def delete_cve(self, cve_id: str) -> bool:
         """Delete a CVE record using Supabase."""
+        self._cve_cache.pop(cve_id)
         try:
-            result = db_manager.supabase.table("cves").delete().eq("cve_id", cve_id).execute()
+            result = await asyncio.to_thread(returning_columns(db_manager.supabase.table("cves").delete().eq("cve_id", cve_id), "id").execute)
             return bool(result.data)
         except Exception as e:
             logger.error(f"Error deleting CVE {cve_id}", error=str(e))
             return False
     
+    async def count_cves(self) -> int:
+        """Get the exact CVE count without transferring any rows."""
+        if db_manager.pg_pool is not None:
+            return await db_manager.pg_pool.fetchval("SELECT count(*) FROM cves")
+        
+        # limit(0) returns no rows; the count still arrives in the Content-Range header
+        result = await asyncio.to_thread(db_manager.supabase.table("cves").select("id", count="exact").limit(0).execute)
+        return result.count if result.count is not None else 0
+    
     async def get_statistics(self) -> CVEStatistics:
-        """Get CVE statistics using Supabase."""
+        """
+        Get CVE statistics using Supabase.
+        
+        Results are cached for stats_cache_ttl seconds (in Redis when configured,
+        in-process otherwise); the last result is served for up to cache_ttl_long
+        seconds if a refresh fails.
+        """
         try:
-            # Get total count
-            total_result = db_manager.supabase.table("cves").select("count", count="exact").execute()
-            total_cves = total_result.count if total_result.count is not None else 0
-            
-            # For now, return basic stats - can be enhanced later with more complex queries
-            return CVEStatistics(
-                total_cves=total_cves, 
-                critical_cves=0, 
-                high_cves=0, 
-                medium_cves=0,
-                low_cves=0, 
-                unscored_cves=0, 
-                last_updated=datetime.now(timezone.utc),
-                today_published=0, 
-                week_published=0, 
-                month_published=0
+            stats, _ = await cache_manager.get_with_fallback(
+                STATISTICS_CACHE_KEY,
+                self._fetch_statistics,
+                fresh_ttl=settings.stats_cache_ttl,
+                stale_ttl=settings.cache_ttl_long
             )
+            return CVEStatistics(**stats)
         except Exception as e:
             logger.error("Error getting CVE statistics", error=str(e))
             return CVEStatistics(
@@ -279,65 +482,164 @@ class CVEService:
                 today_published=0, week_published=0, month_published=0
             )
     
-    async def upsert_cve_from_nvd(self, nvd_item: NVDCVEItem) -> Tuple[str, bool]:
-        """
-        Insert or update CVE from NVD data.
-        Returns (cve_id, was_created).
-        """
-        try:
-            cve_data = self._process_nvd_item(nvd_item)
-            
-            # Check if CVE exists
-            existing_cve = await self.get_cve_by_id(cve_data.cve_id)
-            
-            if existing_cve:
-                # Update if newer data
-                if (cve_data.last_modified and existing_cve.last_modified and 
-                    cve_data.last_modified > existing_cve.last_modified):
-                    
-                    update_data = CVEUpdate(**cve_data.dict(exclude={'cve_id'}))
-                    await self.update_cve(cve_data.cve_id, update_data)
-                    logger.debug(f"Updated CVE {cve_data.cve_id}")
-                    return cve_data.cve_id, False
-                else:
-                    logger.debug(f"CVE {cve_data.cve_id} is up to date")
-                    return cve_data.cve_id, False
-            else:
-                # Create new CVE
-                await self.create_cve(cve_data)
-                logger.debug(f"Created CVE {cve_data.cve_id}")
-                return cve_data.cve_id, True
-                
-        except Exception as e:
-            logger.error(f"Error upserting CVE from NVD data", error=str(e))
-            raise
+    async def _fetch_statistics(self) -> Dict[str, Any]:
+        """Compute CVE statistics as a JSON-ready dict from the cve_statistics view in one query."""
+        if db_manager.pg_pool is not None:
+            async with db_manager.pg_pool.acquire() as conn:
+                row = dict(await conn.fetchrow("SELECT * FROM cve_statistics"))
+        else:
+            result = await asyncio.to_thread(db_manager.supabase.table("cve_statistics").select("*").execute)
+            row = result.data[0]
+        
+        return CVEStatistics(**row).model_dump(mode='json')
     
-    async def upsert_cves_batch(self, nvd_items: List[NVDCVEItem]) -> Tuple[int, int]:
+    async def upsert_cves_batch(self, nvd_items: List[NVDVulnerability]) -> Tuple[int, int]:
         """
         Batch upsert CVEs from NVD data.
-        Returns (created_count, updated_count).
-        """
-        created_count = 0
-        updated_count = 0
+        Returns (created_count, updated_count); items already up to date count as neither.
         
-        # Process each CVE item (Supabase handles individual operations atomically)
+        Existing rows are looked up with one IN query per chunk of IDs before any item
+        is processed, so CVEs whose lastModified is not newer than the stored row are
+        skipped without being converted or rewritten. New and changed CVEs are written
+        with bulk upserts.
+        """
+        # Later items win if the batch carries the same CVE twice; a single upsert
+        # statement cannot touch one row twice
+        candidates: Dict[str, NVDVulnerability] = {}
+        errors: List[Tuple[str, Exception]] = []
         for nvd_item in nvd_items:
+            cve_id = nvd_item.cve.get('id')
+            if isinstance(cve_id, str) and is_valid_cve_id(cve_id):
+                candidates[cve_id.upper()] = nvd_item
+            else:
+                errors.append((str(cve_id), ValueError(f"Invalid CVE ID: {cve_id}")))
+        
+        if not candidates:
+            _log_batch_errors("Error processing CVEs in batch", errors)
+            return 0, 0
+        
+        # Blocking Supabase calls go to threads so NVD page prefetches keep running
+        existing = await asyncio.to_thread(self._fetch_last_modified, list(candidates))
+        
+        insert_rows = []
+        update_rows = []
+        for cve_id, nvd_item in candidates.items():
+            is_new = cve_id not in existing
+            if not is_new:
+                last_modified = self._parse_date(nvd_item.cve.get('lastModified'))
+                stored = existing[cve_id]
+                if not last_modified or (stored is not None and last_modified <= stored):
+                    continue
             try:
-                cve_id, was_created = await self.upsert_cve_from_nvd(nvd_item)
-                if was_created:
-                    created_count += 1
-                else:
-                    updated_count += 1
+                row = self._ingest_row_to_dict(self._process_nvd_item(nvd_item))
             except Exception as e:
-                logger.error(f"Error processing CVE in batch", error=str(e))
+                errors.append((cve_id, e))
                 continue
+            (insert_rows if is_new else update_rows).append(row)
+        _log_batch_errors("Error processing CVEs in batch", errors)
         
+        created_count, updated_count = await asyncio.gather(
+            self._bulk_upsert(insert_rows),
+            self._bulk_upsert(update_rows)
+        )
         return created_count, updated_count
     
-    def _process_nvd_item(self, nvd_item: NVDCVEItem) -> CVECreate:
-        """Process NVD CVE item into CVECreate model with data cleansing."""
+    def _fetch_last_modified(self, cve_ids: List[str]) -> Dict[str, Optional[datetime]]:
+        """Get last_modified for the CVEs among cve_ids that already exist."""
+        existing: Dict[str, Optional[datetime]] = {}
+        for i in range(0, len(cve_ids), EXISTING_LOOKUP_CHUNK_SIZE):
+            chunk = cve_ids[i:i + EXISTING_LOOKUP_CHUNK_SIZE]
+            result = db_manager.supabase.table("cves").select("cve_id,last_modified").in_("cve_id", chunk).execute()
+            for row in result.data or []:
+                existing[row["cve_id"]] = self._parse_date(row["last_modified"])
+        return existing
+    
+    async def _bulk_upsert(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Upsert cves rows on cve_id in chunks of UPSERT_CHUNK_SIZE; returns rows written.
+        
+        Chunks are written concurrently so their round trips overlap, with at most
+        UPSERT_CONCURRENCY requests in flight across the service.
+        """
+        async def upsert_chunk(chunk: List[Dict[str, Any]]) -> int:
+            async with self._upsert_slots:
+                try:
+                    await asyncio.to_thread(self._upsert_cve_rows, chunk)
+                    return len(chunk)
+                except Exception as e:
+                    logger.warning("Bulk CVE upsert failed, retrying rows individually", rows=len(chunk), error=str(e))
+            # Outside the slot: the fallback paces its own requests
+            return await self._upsert_rows_individually(chunk)
+        
+        written = await asyncio.gather(*(
+            upsert_chunk(rows[i:i + UPSERT_CHUNK_SIZE])
+            for i in range(0, len(rows), UPSERT_CHUNK_SIZE)
+        ))
+        return sum(written)
+    
+    async def _upsert_rows_individually(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Upsert rows one request each, UPSERT_FALLBACK_CONCURRENCY at a time.
+        
+        Used when a bulk upsert is rejected, so one bad row does not drop the whole chunk.
+        Returns the number of rows written.
+        """
+        semaphore = asyncio.Semaphore(UPSERT_FALLBACK_CONCURRENCY)
+        
+        async def upsert_one(row: Dict[str, Any]) -> None:
+            async with semaphore:
+                # The Supabase client is synchronous; threads let the requests overlap
+                await asyncio.to_thread(self._upsert_cve_rows, [row])
+        
+        results = await asyncio.gather(*(upsert_one(row) for row in rows), return_exceptions=True)
+        errors = [
+            (row["cve_id"], result)
+            for row, result in zip(rows, results)
+            if isinstance(result, Exception)
+        ]
+        _log_batch_errors("Error upserting CVEs", errors)
+        return len(rows) - len(errors)
+    
+    def _upsert_cve_rows(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Upsert cves rows on cve_id with an orjson-encoded request body.
+        
+        Goes through the PostgREST session directly because the query builder encodes
+        bodies with the stdlib json module; raw_data makes these payloads large.
+        return=minimal stops PostgREST from echoing every written row back.
+        """
+        response = db_manager.supabase.postgrest.session.post(
+            "/cves",
+            params={"on_conflict": "cve_id"},
+            content=orjson.dumps(rows),
+            headers={
+                "Content-Type": "application/json",
+                "Prefer": "return=minimal,resolution=merge-duplicates",
+            },
+        )
+        if response.status_code >= 400:
+            raise APIError(response.json())
+    
+    def _cve_to_row(self, cve_data: CVECreate) -> Dict[str, Any]:
+        """Convert a CVECreate into a JSON-ready cves row for Supabase writes."""
+        return cve_data.model_dump(mode='json', by_alias=True, exclude={"descriptions"})
+    
+    def _ingest_row_to_dict(self, row: CVEIngestRow) -> Dict[str, Any]:
+        """Convert a CVEIngestRow into a JSON-ready cves row for Supabase writes."""
+        return msgspec.to_builtins(row)
+    
+    def _process_nvd_item(self, nvd_item: Union[NVDCVEItem, NVDVulnerability]) -> CVEIngestRow:
+        """
+        Process NVD CVE item into a CVEIngestRow with data cleansing.
+        
+        Applies the same checks CVECreate would: a well-formed CVE ID (upper-cased)
+        and CVSS scores within 0-10.
+        """
         cve_data = nvd_item.cve
         cve_id = cve_data['id']
+        if not is_valid_cve_id(cve_id):
+            raise ValueError(f"Invalid CVE ID: {cve_id}")
+        cve_id = cve_id if cve_id.startswith('CVE-') else cve_id.upper()
         
         # Extract basic information
         source_identifier = cve_data.get('sourceIdentifier', '')
@@ -351,8 +653,10 @@ class CVEService:
         description = self._extract_description(cve_data.get('descriptions', []))
         
         # Extract CVSS scores
-        cvss_v2_score, cvss_v2_vector, cvss_v2_severity = self._extract_cvss_v2(cve_data.get('metrics', {}))
-        cvss_v3_score, cvss_v3_vector, cvss_v3_severity = self._extract_cvss_v3(cve_data.get('metrics', {}))
+        (
+            (cvss_v2_score, cvss_v2_vector, cvss_v2_severity),
+            (cvss_v3_score, cvss_v3_vector, cvss_v3_severity),
+        ) = self._extract_cvss(cve_data.get('metrics') or {})
         
         # Extract configurations (affected systems)
         configurations = cve_data.get('configurations', [])
@@ -363,24 +667,27 @@ class CVEService:
         # Extract weaknesses (CWE)
         weaknesses = cve_data.get('weaknesses', [])
         
-        return CVECreate(
-            cve_id=cve_id,
-            source_identifier=source_identifier,
-            vuln_status=vuln_status,
-            published=published,
-            last_modified=last_modified,
-            description=description,
-            cvss_v2_score=Decimal(str(cvss_v2_score)) if cvss_v2_score else None,
-            cvss_v3_score=Decimal(str(cvss_v3_score)) if cvss_v3_score else None,
-            cvss_v2_vector=cvss_v2_vector,
-            cvss_v3_vector=cvss_v3_vector,
-            cvss_v2_severity=cvss_v2_severity,
-            cvss_v3_severity=cvss_v3_severity,
-            cpe_configurations=configurations,
-            references=references,
-            weaknesses=weaknesses,
-            configurations=configurations,
-            raw_data=cve_data
+        return msgspec.convert(
+            {
+                "cve_id": cve_id,
+                "source_identifier": source_identifier,
+                "vuln_status": vuln_status,
+                "published": published,
+                "last_modified": last_modified,
+                "description": description,
+                "cvss_v2_score": cvss_v2_score,
+                "cvss_v3_score": cvss_v3_score,
+                "cvss_v2_vector": cvss_v2_vector,
+                "cvss_v3_vector": cvss_v3_vector,
+                "cvss_v2_severity": cvss_v2_severity,
+                "cvss_v3_severity": cvss_v3_severity,
+                "cpe_configurations": configurations,
+                "cve_references": references,
+                "weaknesses": weaknesses,
+                "configurations": configurations,
+                "raw_data": cve_data,
+            },
+            CVEIngestRow
         )
     
     def _parse_date(self, date_str: Optional[str]) -> Optional[datetime]:
@@ -388,65 +695,47 @@ class CVEService:
         if not date_str:
             return None
         try:
-            # Handle NVD date format
-            dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-            # Ensure timezone-aware datetime
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
-            return dt
-        except (ValueError, AttributeError):
+            return parse_iso_datetime(date_str)
+        except (ValueError, TypeError):
             logger.warning(f"Failed to parse date: {date_str}")
             return None
     
     def _extract_description(self, descriptions: List[Dict[str, Any]]) -> Optional[str]:
-        """Extract description, preferring English."""
+        """Extract description, preferring English and falling back to the first one."""
         if not descriptions:
             return None
-        
-        # Look for English description first
-        for desc in descriptions:
-            if desc.get('lang', '').lower() == 'en':
-                return desc.get('value', '').strip()
-        
-        # Fallback to first available description
-        if descriptions:
-            return descriptions[0].get('value', '').strip()
-        
-        return None
+        desc = next(
+            (d for d in descriptions if (d.get('lang') or '').lower() == 'en'),
+            descriptions[0]
+        )
+        return desc.get('value', '').strip()
     
-    def _extract_cvss_v2(self, metrics: Dict[str, Any]) -> Tuple[Optional[float], Optional[str], Optional[str]]:
-        """Extract CVSS v2 information."""
-        cvss_v2_metrics = metrics.get('cvssMetricV2', [])
-        if not cvss_v2_metrics:
-            return None, None, None
-        
-        # Use the first (primary) metric
-        metric = cvss_v2_metrics[0]
-        cvss_data = metric.get('cvssData', {})
-        
-        score = cvss_data.get('baseScore')
-        vector = cvss_data.get('vectorString')
-        severity = cvss_data.get('baseSeverity', '').upper()
+    def _extract_cvss(self, metrics: Dict[str, Any]) -> Tuple[CVSSFields, CVSSFields]:
+        """
+        Extract (score, vector, severity) for CVSS v2 and v3 in one pass over metrics.
         
-        return score, vector, severity
-    
-    def _extract_cvss_v3(self, metrics: Dict[str, Any]) -> Tuple[Optional[float], Optional[str], Optional[str]]:
-        """Extract CVSS v3 information."""
-        # Try v3.1 first, then v3.0
-        for version in ['cvssMetricV31', 'cvssMetricV30']:
-            cvss_metrics = metrics.get(version, [])
+        v3.1 is preferred over v3.0; the first (primary) metric of each version is used.
+        """
+        v2 = v3 = (None, None, None)
+        for version in ('cvssMetricV31', 'cvssMetricV30'):
+            cvss_metrics = metrics.get(version)
             if cvss_metrics:
-                # Use the first (primary) metric
-                metric = cvss_metrics[0]
-                cvss_data = metric.get('cvssData', {})
-                
-                score = cvss_data.get('baseScore')
-                vector = cvss_data.get('vectorString')
-                severity = cvss_data.get('baseSeverity', '').upper()
-                
-                return score, vector, severity
-        
-        return None, None, None
+                v3 = self._cvss_fields(cvss_metrics[0])
+                break
+        cvss_metrics = metrics.get('cvssMetricV2')
+        if cvss_metrics:
+            v2 = self._cvss_fields(cvss_metrics[0])
+        return v2, v3
+    
+    @staticmethod
+    def _cvss_fields(metric: Dict[str, Any]) -> CVSSFields:
+        """Get (score, vector, severity) from one NVD CVSS metric entry."""
+        cvss_data = metric.get('cvssData') or {}
+        return (
+            cvss_data.get('baseScore'),
+            cvss_data.get('vectorString'),
+            (cvss_data.get('baseSeverity') or '').upper(),
+        )
     
     def _row_to_cve_response(self, row: dict) -> CVEResponse:
         """Convert database row to CVEResponse model."""
@@ -472,3 +761,7 @@ class CVEService:
             updated_at=row['updated_at'],
             descriptions=[]  # Will be populated from description field
         )
+    
+    def _row_to_cve_record(self, row: dict) -> CVERecord:
+        """Convert database row to a CVERecord without Pydantic validation."""
+        return msgspec.convert({**row, "references": row.get("cve_references")}, CVERecord)
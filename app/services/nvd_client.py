@@ -2,14 +2,24 @@
 NVD (National Vulnerability Database) API client for fetching CVE data.
 """
 import asyncio
+import random
 import aiohttp
 from datetime import datetime, timedelta, timezone
-from typing import Optional, List, Dict, Any, AsyncGenerator
-from urllib.parse import urljoin
+from email.utils import parsedate_to_datetime
+from typing import Optional, List, Dict, Any, AsyncGenerator, Awaitable, Callable
+import msgspec
 import structlog
+from yarl import URL
 
+try:
+    import aiodns  # noqa: F401 - enables aiohttp's AsyncResolver
+    from aiohttp.resolver import AsyncResolver
+except ImportError:
+    AsyncResolver = None
+
+from app.core.cache import cache_manager
 from app.core.config import settings
-from app.models.cve import NVDResponse, NVDCVEItem
+from app.models.cve import NVDResponse, NVDCVEItem, NVDPage, NVDVulnerability
 
 logger = structlog.get_logger(__name__)
 
@@ -24,11 +34,130 @@ class RateLimitError(NVDAPIError):
     pass
 
 
+# Upper bound in seconds on the jittered delay between retries of one request
+RETRY_BACKOFF_CAP = 60.0
+
+# Bytes of an error response body read for logging and error messages
+ERROR_BODY_LIMIT = 4096
+
+
+class RequestRateLimiter:
+    """
+    Leaky-bucket limiter allowing max_rate requests per time_period seconds.
+    
+    Requests under the budget go straight through; only those that would exceed
+    it wait, so pacing costs nothing while traffic is below the cap.
+    """
+    
+    def __init__(self, max_rate: float, time_period: float):
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._level = 0.0
+        self._last_drain: Optional[float] = None
+    
+    async def acquire(self) -> None:
+        """Wait until one more request fits in the budget, then take it."""
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            if self._last_drain is not None:
+                drained = (now - self._last_drain) * self.max_rate / self.time_period
+                self._level = max(0.0, self._level - drained)
+            self._last_drain = now
+            
+            if self._level + 1 <= self.max_rate:
+                self._level += 1
+                return
+            await asyncio.sleep((self._level + 1 - self.max_rate) * self.time_period / self.max_rate)
+
+
+# Shared by every NVDClient so concurrent syncs draw on one request budget
+nvd_rate_limiter = RequestRateLimiter(
+    max_rate=(
+        settings.nvd_requests_per_window_with_key if settings.nvd_api_key
+        else settings.nvd_requests_per_window
+    ),
+    time_period=settings.nvd_rate_limit_window
+)
+
+
+def _format_nvd_date(value: datetime) -> str:
+    """Format a datetime the way NVD date filters expect, without strftime's overhead."""
+    return (
+        f"{value.year:04d}-{value.month:02d}-{value.day:02d}"
+        f"T{value.hour:02d}:{value.minute:02d}:{value.second:02d}.000"
+    )
+
+
+# Reused msgspec decoder for bulk ingest pages
+_nvd_page_decoder = msgspec.json.Decoder(NVDPage)
+
+# NVD lookups by CVE ID: recent results, and requests currently in flight
+_nvd_cve_cache = cache_manager.local_cache(settings.cve_cache_size, settings.nvd_cve_cache_ttl)
+_nvd_cve_lookups: Dict[str, "asyncio.Future[Optional[NVDCVEItem]]"] = {}
+
+
+# One aiohttp session for all NVD calls, so TLS connections are reused across clients
+_shared_session: Optional[aiohttp.ClientSession] = None
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """Get the shared NVD session, creating it on first use."""
+    global _shared_session
+    if _shared_session is None or _shared_session.closed:
+        headers = {
+            'User-Agent': f'{settings.app_name}/{settings.app_version}',
+            'Accept': 'application/json',
+        }
+        
+        if settings.nvd_api_key:
+            headers['apiKey'] = settings.nvd_api_key
+        
+        # Resolve on the event loop through c-ares when aiodns is installed, instead
+        # of handing each getaddrinfo call to a thread
+        resolver = AsyncResolver() if AsyncResolver is not None and settings.nvd_async_dns else None
+        
+        # Limits apply to the whole process, which is what NVD's per-client limits count
+        connector = aiohttp.TCPConnector(
+            limit=10,  # Total connection pool size
+            limit_per_host=5,  # Per-host connection limit
+            ttl_dns_cache=300,  # DNS cache TTL
+            use_dns_cache=True,
+            resolver=resolver,
+        )
+        
+        _shared_session = aiohttp.ClientSession(
+            headers=headers,
+            connector=connector,
+            # No total cap: a large page that keeps streaming may take as long as it needs,
+            # while a connection that stalls fails fast and is retried
+            timeout=aiohttp.ClientTimeout(
+                total=None,
+                connect=settings.nvd_connect_timeout,
+                sock_connect=settings.nvd_connect_timeout,
+                sock_read=settings.nvd_timeout
+            )
+        )
+        logger.info("NVD API client session created")
+    return _shared_session
+
+
+async def close_shared_session() -> None:
+    """Close the shared NVD session."""
+    global _shared_session
+    if _shared_session is not None:
+        await _shared_session.close()
+        _shared_session = None
+        logger.info("NVD API client session closed")
+
+
 class NVDClient:
     """Client for interacting with the NVD CVE API."""
     
     def __init__(self):
         self.base_url = settings.nvd_api_base_url
+        # Parsed once; aiohttp takes URL objects without re-parsing them
+        self._base_url = URL(self.base_url)
         self.api_key = settings.nvd_api_key
         self.rate_limit_delay = settings.nvd_rate_limit_delay
         self.max_retries = settings.nvd_max_retries
@@ -46,97 +175,80 @@ class NVDClient:
         await self.close_session()
     
     async def create_session(self):
-        """Create aiohttp session with appropriate headers."""
-        headers = {
-            'User-Agent': f'{settings.app_name}/{settings.app_version}',
-            'Accept': 'application/json',
-        }
-        
-        if self.api_key:
-            headers['apiKey'] = self.api_key
-        
-        connector = aiohttp.TCPConnector(
-            limit=10,  # Total connection pool size
-            limit_per_host=5,  # Per-host connection limit
-            ttl_dns_cache=300,  # DNS cache TTL
-            use_dns_cache=True,
-        )
-        
-        timeout = aiohttp.ClientTimeout(total=self.timeout)
-        
-        self.session = aiohttp.ClientSession(
-            headers=headers,
-            connector=connector,
-            timeout=timeout
-        )
-        
-        logger.info("NVD API client session created")
+        """Attach the process-wide NVD session."""
+        self.session = await get_session()
     
     async def close_session(self):
-        """Close aiohttp session."""
-        if self.session:
-            await self.session.close()
-            self.session = None
-            logger.info("NVD API client session closed")
+        """Detach from the shared session; it is closed at application shutdown."""
+        self.session = None
     
-    async def _make_request(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Make HTTP request to NVD API with error handling and retries."""
+    async def _make_request(self, endpoint: str, params: Dict[str, Any]) -> bytes:
+        """
+        Make HTTP request to NVD API with error handling and retries.
+        
+        Returns the raw response body so callers can validate it straight from JSON.
+        """
         if not self.session:
             await self.create_session()
         
-        url = urljoin(self.base_url, endpoint)
+        url = self._base_url / endpoint.lstrip('/') if endpoint else self._base_url
         
+        delay = self.rate_limit_delay
+        retry_floor = 0.0
         for attempt in range(self.max_retries + 1):
             try:
-                # Apply rate limiting
                 if attempt > 0:
-                    delay = self.rate_limit_delay * (2 ** (attempt - 1))  # Exponential backoff
-                    await asyncio.sleep(delay)
+                    # Decorrelated jitter keeps concurrent callers from retrying in lockstep;
+                    # a server-sent Retry-After or reset time is a floor on the wait
+                    delay = random.uniform(self.rate_limit_delay, min(RETRY_BACKOFF_CAP, delay * 3))
+                    await asyncio.sleep(max(delay, retry_floor))
+                    retry_floor = 0.0
                 
-                logger.debug("Making NVD API request", url=url, params=params, attempt=attempt + 1)
+                await nvd_rate_limiter.acquire()
+                
+                logger.debug("Making NVD API request", url=str(url), params=params, attempt=attempt + 1)
                 
                 async with self.session.get(url, params=params) as response:
                     # Handle rate limiting
-                    if response.status == 403:
-                        rate_limit_delay = float(response.headers.get('X-RateLimit-Reset', self.rate_limit_delay))
+                    if response.status in (403, 429):
+                        retry_floor = self._retry_after(response)
                         if attempt < self.max_retries:
                             logger.warning(
                                 "Rate limit exceeded, retrying",
-                                delay=rate_limit_delay,
+                                delay=retry_floor,
                                 attempt=attempt + 1
                             )
-                            await asyncio.sleep(rate_limit_delay)
                             continue
                         else:
                             raise RateLimitError("Rate limit exceeded and max retries reached")
                     
                     # Handle other HTTP errors
                     if response.status >= 400:
-                        error_text = await response.text()
+                        # Proxies can answer with multi-megabyte error pages; a prefix is enough to log
+                        error_text = (await response.content.read(ERROR_BODY_LIMIT)).decode('utf-8', errors='replace')
                         logger.error(
                             "NVD API request failed",
                             status=response.status,
                             response=error_text,
-                            url=url
+                            url=str(url)
                         )
                         
                         if response.status >= 500 and attempt < self.max_retries:
-                            # Retry on server errors
+                            # Retry on server errors, no sooner than a 503 asks
+                            if response.status == 503:
+                                retry_floor = self._retry_after(response)
                             continue
                         
                         raise NVDAPIError(f"HTTP {response.status}: {error_text}")
                     
-                    # Parse successful response
-                    data = await response.json()
-                    
-                    logger.debug(
-                        "NVD API request successful",
-                        status=response.status,
-                        total_results=data.get('totalResults', 0),
-                        results_count=data.get('resultsPerPage', 0)
-                    )
-                    
-                    return data
+                    body = await response.read()
+                    logger.debug("NVD API request successful", status=response.status, bytes=len(body))
+                    return body
+            
+            except (aiohttp.ClientSSLError, aiohttp.InvalidURL) as e:
+                # TLS and URL misconfiguration fail identically on every attempt
+                logger.error("Non-retryable error during NVD API request", error=str(e))
+                raise NVDAPIError(f"Non-retryable network error: {str(e)}") from e
             
             except aiohttp.ClientError as e:
                 logger.error("Network error during NVD API request", error=str(e), attempt=attempt + 1)
@@ -152,6 +264,28 @@ class NVDClient:
         
         raise NVDAPIError("Max retries exceeded")
     
+    def _retry_after(self, response: aiohttp.ClientResponse) -> float:
+        """
+        Get the seconds a throttled response asks us to wait, defaulting to rate_limit_delay.
+        
+        Retry-After may be delay-seconds or an HTTP-date; X-RateLimit-Reset is read
+        as seconds when Retry-After is absent.
+        """
+        value = response.headers.get('Retry-After') or response.headers.get('X-RateLimit-Reset')
+        if not value:
+            return self.rate_limit_delay
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return self.rate_limit_delay
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    
     async def get_cves(
         self,
         start_index: int = 0,
@@ -195,20 +329,57 @@ class NVDClient:
         Returns:
             NVDResponse object containing CVE data
         """
-        params = {
-            'startIndex': start_index,
-            'resultsPerPage': results_per_page or self.results_per_page
-        }
+        params = self._build_params(
+            pub_start_date=pub_start_date,
+            pub_end_date=pub_end_date,
+            last_mod_start_date=last_mod_start_date,
+            last_mod_end_date=last_mod_end_date,
+            cve_id=cve_id,
+            cpename=cpename,
+            cvss_v2_severity=cvss_v2_severity,
+            cvss_v3_severity=cvss_v3_severity,
+            keyword_search=keyword_search,
+            keyword_exact_match=keyword_exact_match,
+            has_cert_alerts=has_cert_alerts,
+            has_cert_notes=has_cert_notes,
+            has_kev=has_kev,
+            has_oval=has_oval
+        )
+        return await self._request_page(start_index, results_per_page or self.results_per_page, params)
+    
+    def _build_params(
+        self,
+        pub_start_date: Optional[datetime] = None,
+        pub_end_date: Optional[datetime] = None,
+        last_mod_start_date: Optional[datetime] = None,
+        last_mod_end_date: Optional[datetime] = None,
+        cve_id: Optional[str] = None,
+        cpename: Optional[str] = None,
+        cvss_v2_severity: Optional[str] = None,
+        cvss_v3_severity: Optional[str] = None,
+        keyword_search: Optional[str] = None,
+        keyword_exact_match: bool = False,
+        has_cert_alerts: Optional[bool] = None,
+        has_cert_notes: Optional[bool] = None,
+        has_kev: Optional[bool] = None,
+        has_oval: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the NVD query parameters for the get_cves filters, excluding pagination.
+        
+        get_all_cves builds these once and reuses them for every page.
+        """
+        params: Dict[str, Any] = {}
         
         # Date filters
         if pub_start_date:
-            params['pubStartDate'] = pub_start_date.strftime('%Y-%m-%dT%H:%M:%S.000')
+            params['pubStartDate'] = _format_nvd_date(pub_start_date)
         if pub_end_date:
-            params['pubEndDate'] = pub_end_date.strftime('%Y-%m-%dT%H:%M:%S.000')
+            params['pubEndDate'] = _format_nvd_date(pub_end_date)
         if last_mod_start_date:
-            params['lastModStartDate'] = last_mod_start_date.strftime('%Y-%m-%dT%H:%M:%S.000')
+            params['lastModStartDate'] = _format_nvd_date(last_mod_start_date)
         if last_mod_end_date:
-            params['lastModEndDate'] = last_mod_end_date.strftime('%Y-%m-%dT%H:%M:%S.000')
+            params['lastModEndDate'] = _format_nvd_date(last_mod_end_date)
         
         # Other filters
         if cve_id:
@@ -231,17 +402,24 @@ class NVDClient:
         if has_oval is not None:
             params['hasOval'] = str(has_oval).lower()
         
-        # Remove None values
-        params = {k: v for k, v in params.items() if v is not None}
-        
-        data = await self._make_request('', params)
-        return NVDResponse(**data)
+        return params
+    
+    async def _request_page(
+        self,
+        start_index: int,
+        results_per_page: int,
+        params: Dict[str, Any]
+    ) -> NVDResponse:
+        """Request one page of results for prebuilt filter params."""
+        page_params = {'startIndex': start_index, 'resultsPerPage': results_per_page, **params}
+        # Parsed and validated in one pass by pydantic-core, without an intermediate dict
+        return NVDResponse.model_validate_json(await self._make_request('', page_params))
     
     async def get_all_cves(
         self,
         max_results: Optional[int] = None,
         **kwargs
-    ) -> AsyncGenerator[NVDCVEItem, None]:
+    ) -> AsyncGenerator[NVDVulnerability, None]:
         """
         Fetch all CVEs with pagination, yielding individual CVE items.
         
@@ -250,49 +428,143 @@ class NVDClient:
             **kwargs: Additional filters passed to get_cves
         
         Yields:
-            Individual NVDCVEItem objects
+            Individual NVDVulnerability objects
+        """
+        async for page in self._iter_pages(max_results, **kwargs):
+            for vuln in page:
+                yield vuln
+    
+    async def get_all_cves_batched(
+        self,
+        batch_size: int = 500,
+        max_results: Optional[int] = None,
+        on_total: Optional[Callable[[int], Awaitable[None]]] = None,
+        **kwargs
+    ) -> AsyncGenerator[List[NVDVulnerability], None]:
         """
-        start_index = 0
-        fetched_count = 0
+        Fetch all CVEs with pagination, yielding lists of up to batch_size items.
         
-        while True:
+        Lets bulk consumers such as the sync write a batch per iteration instead of
+        stepping through the feed one item at a time. Each batch is a new list, so
+        consumers may keep it after asking for the next one.
+        
+        Args:
+            batch_size: Items per yielded batch; only the last batch may be smaller
+            max_results: Maximum number of CVEs to fetch (None for all)
+            on_total: Awaited with the number of CVEs to expect once the first page
+                arrives, so callers need no separate count request
+            **kwargs: Additional filters passed to get_cves
+        
+        Yields:
+            Lists of NVDVulnerability objects
+        """
+        batch: List[NVDVulnerability] = []
+        async for page in self._iter_pages(max_results, on_total, **kwargs):
+            while page:
+                take = batch_size - len(batch)
+                batch.extend(page[:take])
+                page = page[take:]
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+    
+    async def _iter_pages(
+        self,
+        max_results: Optional[int] = None,
+        on_total: Optional[Callable[[int], Awaitable[None]]] = None,
+        **kwargs
+    ) -> AsyncGenerator[List[NVDVulnerability], None]:
+        """
+        Fetch every page of a query, yielding each page's items.
+        
+        The first page reports the total; the remaining pages are then fetched with
+        up to nvd_concurrency requests in flight, paced by the shared NVD rate
+        limiter, and yielded in completion order. on_total, if given, is awaited with
+        the total before the first page is yielded. Fetches keep running while the
+        consumer works on a page, but no more than nvd_concurrency are started
+        ahead of it, so a slow consumer does not buffer the whole feed.
+        """
+        results_per_page = kwargs.pop('results_per_page', None) or self.results_per_page
+        if max_results:
+            results_per_page = min(results_per_page, max_results)
+        params = self._build_params(**kwargs)
+        
+        response = await self._fetch_page(0, results_per_page, params)
+        total = response.total_results
+        if max_results:
+            total = min(total, max_results)
+        if on_total:
+            await on_total(total)
+        # NVD may cap the page size below what was asked for
+        page_size = len(response.vulnerabilities)
+        
+        fetched_count = min(page_size, total)
+        yield response.vulnerabilities[:total]
+        
+        if page_size:
+            start_indices = iter(range(page_size, total, page_size))
+            pending = set()
             try:
-                # Adjust results per page if max_results is specified
-                if max_results and (max_results - fetched_count) < self.results_per_page:
-                    kwargs['results_per_page'] = max_results - fetched_count
-                
-                response = await self.get_cves(start_index=start_index, **kwargs)
-                
-                if not response.vulnerabilities:
-                    break
-                
-                for vuln in response.vulnerabilities:
-                    yield vuln
-                    fetched_count += 1
-                    
-                    if max_results and fetched_count >= max_results:
-                        return
-                
-                # Check if we've fetched all available results
-                if start_index + len(response.vulnerabilities) >= response.total_results:
-                    break
-                
-                start_index += len(response.vulnerabilities)
-                
-                # Rate limiting between requests
-                await asyncio.sleep(self.rate_limit_delay)
-                
-            except Exception as e:
-                logger.error(
-                    "Error fetching CVEs batch",
-                    start_index=start_index,
-                    error=str(e)
-                )
-                raise
+                self._schedule_pages(pending, start_indices, page_size, total, params)
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    # Refill before handing pages over, so the next fetches run while
+                    # the consumer is busy with these
+                    self._schedule_pages(pending, start_indices, page_size, total, params)
+                    for task in done:
+                        page = task.result().vulnerabilities
+                        fetched_count += len(page)
+                        yield page
+            finally:
+                for task in pending:
+                    task.cancel()
         
         logger.info(f"Fetched {fetched_count} CVEs from NVD API")
     
-    async def get_recent_cves(self, days: int = 7) -> AsyncGenerator[NVDCVEItem, None]:
+    def _schedule_pages(
+        self,
+        pending: set,
+        start_indices,
+        page_size: int,
+        total: int,
+        params: Dict[str, Any]
+    ) -> None:
+        """Start page fetches from start_indices until nvd_concurrency are pending."""
+        while len(pending) < settings.nvd_concurrency:
+            start_index = next(start_indices, None)
+            if start_index is None:
+                return
+            pending.add(asyncio.create_task(
+                self._fetch_page(start_index, min(page_size, total - start_index), params)
+            ))
+    
+    async def _fetch_page(
+        self,
+        start_index: int,
+        results_per_page: int,
+        params: Dict[str, Any]
+    ) -> NVDPage:
+        """
+        Fetch one page for get_all_cves, logging the start index on failure.
+        
+        Bulk ingest decodes pages straight into msgspec structs instead of validating
+        an NVDResponse; upsert_cves_batch only reads each item's raw cve dict and
+        validates what it keeps when building rows.
+        """
+        page_params = {'startIndex': start_index, 'resultsPerPage': results_per_page, **params}
+        try:
+            return _nvd_page_decoder.decode(await self._make_request('', page_params))
+        except Exception as e:
+            logger.error(
+                "Error fetching CVEs batch",
+                start_index=start_index,
+                error=str(e)
+            )
+            raise
+    
+    async def get_recent_cves(self, days: int = 7) -> AsyncGenerator[NVDVulnerability, None]:
         """
         Fetch CVEs modified in the last N days.
         
@@ -300,7 +572,7 @@ class NVDClient:
             days: Number of days to look back
         
         Yields:
-            Individual NVDCVEItem objects
+            Individual NVDVulnerability objects
         """
         end_date = datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=days)
@@ -322,11 +594,30 @@ class NVDClient:
         
         Returns:
             NVDCVEItem if found, None otherwise
+        
+        Found CVEs are cached in-process for nvd_cve_cache_ttl seconds, and concurrent
+        lookups of the same ID share one request.
         """
+        cached = _nvd_cve_cache.get(cve_id)
+        if cached is not None:
+            return cached
+        
+        lookup = _nvd_cve_lookups.get(cve_id)
+        if lookup is None:
+            lookup = asyncio.ensure_future(self._fetch_cve_by_id(cve_id))
+            _nvd_cve_lookups[cve_id] = lookup
+            lookup.add_done_callback(lambda _: _nvd_cve_lookups.pop(cve_id, None))
+        # Shielded so one caller giving up does not cancel the lookup for the others
+        return await asyncio.shield(lookup)
+    
+    async def _fetch_cve_by_id(self, cve_id: str) -> Optional[NVDCVEItem]:
+        """Request a single CVE from NVD and cache it when found."""
         try:
             response = await self.get_cves(cve_id=cve_id)
             if response.vulnerabilities:
-                return response.vulnerabilities[0]
+                item = response.vulnerabilities[0]
+                _nvd_cve_cache.set(cve_id, item)
+                return item
             return None
         except Exception as e:
             logger.error(f"Error fetching CVE {cve_id}", error=str(e))
@@ -339,10 +630,13 @@ class NVDClient:
         Returns:
             True if API is accessible, False otherwise
         """
+        if not self.session:
+            await self.create_session()
         try:
-            # Fetch a small number of recent CVEs as a health check
-            response = await self.get_cves(results_per_page=1)
-            return response.total_results > 0
+            # One-result page, status only: the body is never read or validated
+            await nvd_rate_limiter.acquire()
+            async with self.session.get(self._base_url, params={'resultsPerPage': 1}) as response:
+                return response.status == 200
         except Exception as e:
             logger.error("NVD API health check failed", error=str(e))
             return False
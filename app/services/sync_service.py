@@ -3,19 +3,61 @@ CVE synchronization service for managing data updates from NVD API.
 """
 import asyncio
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator
 from enum import Enum
+from functools import lru_cache
 
 import structlog
 
-from app.core.database import db_manager
+from app.core.database import db_manager, returning_columns
+from app.core.cache import cache_manager
 from app.core.config import settings
 from app.services.nvd_client import NVDClient
 from app.services.cve_service import CVEService
-from app.models.cve import SyncStatus, SyncTrigger
+from app.models.cve import SyncStatus, SyncTrigger, NVDVulnerability
 
 logger = structlog.get_logger(__name__)
 
+# Columns read into SyncStatus; callers that need fewer can pass their own
+SYNC_STATUS_COLUMNS = tuple(SyncStatus.model_fields)
+SYNC_STATUS_TIMESTAMPS = ("started_at", "completed_at", "last_modified_date")
+
+# Seconds a final status write may take while its sync is being cancelled
+TERMINAL_STATUS_TIMEOUT = 5.0
+
+# Scheduled retry delay after a sync that did not complete
+SYNC_RETRY_INTERVAL = timedelta(hours=1)
+
+# UTC hour of the daily sync_status cleanup
+SYNC_CLEANUP_HOUR = 2
+
+# Seconds _get_last_sync_date reuses its answer; completing a sync clears it sooner
+LAST_SYNC_DATE_TTL = 60
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse a Supabase timestamp string into a timezone-aware datetime."""
+    if not value:
+        return None
+    dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def _row_to_sync_status(row: Dict[str, Any]) -> SyncStatus:
+    """
+    Build a SyncStatus from a sync_status row without validation.
+    
+    Rows come from our own table, so only the timestamps need converting; payloads
+    from outside (NVD) still go through full model validation.
+    """
+    fields = {name: row[name] for name in SyncStatus.model_fields if name in row}
+    for name in SYNC_STATUS_TIMESTAMPS:
+        if name in fields:
+            fields[name] = _parse_timestamp(fields[name])
+    return SyncStatus.model_construct(**fields)
+
 
 class SyncType(Enum):
     """Enumeration for synchronization types."""
@@ -40,6 +82,8 @@ class SyncService:
         self.batch_size = settings.sync_batch_size
         self.max_concurrent_batches = 5
         self._running_sync: Optional[asyncio.Task] = None
+        # Also cleared by cache_manager.invalidate(), which runs after every sync
+        self._last_sync_date_cache = cache_manager.local_cache(1, LAST_SYNC_DATE_TTL)
     
     async def trigger_sync(self, sync_trigger: SyncTrigger) -> int:
         """
@@ -75,28 +119,36 @@ class SyncService:
         logger.info(f"Started {sync_type.value} synchronization", sync_id=sync_id)
         return sync_id
     
-    async def get_sync_status(self, sync_id: Optional[int] = None) -> Optional[SyncStatus]:
-        """Get synchronization status using Supabase."""
+    async def get_sync_status(
+        self,
+        sync_id: Optional[int] = None,
+        columns: Tuple[str, ...] = SYNC_STATUS_COLUMNS
+    ) -> Optional[SyncStatus]:
+        """Get synchronization status using Supabase, reading only the given columns."""
         try:
             if sync_id:
-                result = db_manager.supabase.table("sync_status").select("*").eq("id", sync_id).execute()
+                result = await asyncio.to_thread(db_manager.supabase.table("sync_status").select(*columns).eq("id", sync_id).execute)
             else:
                 # Get latest sync status
-                result = db_manager.supabase.table("sync_status").select("*").order("started_at", desc=True).limit(1).execute()
+                result = await asyncio.to_thread(db_manager.supabase.table("sync_status").select(*columns).order("started_at", desc=True).limit(1).execute)
             
             if result.data and len(result.data) > 0:
-                return SyncStatus(**result.data[0])
+                return _row_to_sync_status(result.data[0])
             return None
         except Exception as e:
             logger.error("Error getting sync status", error=str(e))
             return None
     
-    async def get_sync_history(self, limit: int = 20) -> List[SyncStatus]:
-        """Get synchronization history using Supabase."""
+    async def get_sync_history(
+        self,
+        limit: int = 20,
+        columns: Tuple[str, ...] = SYNC_STATUS_COLUMNS
+    ) -> List[SyncStatus]:
+        """Get synchronization history using Supabase, reading only the given columns."""
         try:
-            result = db_manager.supabase.table("sync_status").select("*").order("started_at", desc=True).limit(limit).execute()
+            result = await asyncio.to_thread(db_manager.supabase.table("sync_status").select(*columns).order("started_at", desc=True).limit(limit).execute)
             
-            return [SyncStatus(**row) for row in result.data] if result.data else []
+            return [_row_to_sync_status(row) for row in result.data] if result.data else []
         except Exception as e:
             logger.error("Error getting sync history", error=str(e))
             return []
@@ -119,23 +171,38 @@ class SyncService:
             self._running_sync = None
         
         # Update sync status to cancelled
-        await self._update_sync_status_error(None, "Synchronization cancelled by user")
+        await self._record_sync_failure(None, "Synchronization cancelled by user")
         logger.info("Synchronization cancelled")
         return True
     
-    async def should_run_sync(self) -> bool:
-        """Check if automatic synchronization should run."""
-        if not settings.sync_enabled:
-            return False
+    async def wait_for_running_sync(self) -> None:
+        """Wait until the current synchronization, if any, has finished."""
+        task = self._running_sync
+        if task is not None:
+            # _perform_sync logs and records its own failures
+            await asyncio.gather(task, return_exceptions=True)
+    
+    async def next_sync_at(self) -> Optional[datetime]:
+        """
+        Get when automatic synchronization is next due, or None if it is disabled.
         
-        # Check last successful sync
-        last_sync = await self.get_sync_status()
-        if not last_sync or last_sync.status != SyncStatusEnum.COMPLETED.value:
-            return True
+        A completed sync is followed after sync_interval_hours; one that failed, was
+        cancelled or is still marked running is retried after SYNC_RETRY_INTERVAL.
+        """
+        if not settings.sync_enabled:
+            return None
         
-        # Check if enough time has passed
-        time_since_sync = datetime.now(timezone.utc) - last_sync.completed_at
-        return time_since_sync.total_seconds() >= (settings.sync_interval_hours * 3600)
+        last_sync = await self.get_sync_status(columns=("status", "started_at", "completed_at"))
+        if not last_sync:
+            return datetime.now(timezone.utc)
+        if last_sync.status == SyncStatusEnum.COMPLETED.value:
+            return last_sync.completed_at + timedelta(hours=settings.sync_interval_hours)
+        return (last_sync.completed_at or last_sync.started_at) + SYNC_RETRY_INTERVAL
+    
+    async def should_run_sync(self) -> bool:
+        """Check if automatic synchronization should run."""
+        next_sync = await self.next_sync_at()
+        return next_sync is not None and next_sync <= datetime.now(timezone.utc)
     
     async def _create_sync_status(self, sync_type: SyncType) -> int:
         """Create a new sync status record using Supabase."""
@@ -146,7 +213,7 @@ class SyncService:
                 "started_at": datetime.now(timezone.utc).isoformat()
             }
             
-            result = db_manager.supabase.table("sync_status").insert(insert_data).execute()
+            result = await asyncio.to_thread(db_manager.supabase.table("sync_status").insert(insert_data).execute)
             
             if result.data and len(result.data) > 0:
                 return result.data[0]["id"]
@@ -160,13 +227,13 @@ class SyncService:
         self,
         sync_id: int,
         status: SyncStatusEnum,
-        total_records: int = 0,
-        processed_records: int = 0,
-        new_records: int = 0,
-        updated_records: int = 0,
+        total_records: Optional[int] = None,
+        processed_records: Optional[int] = None,
+        new_records: Optional[int] = None,
+        updated_records: Optional[int] = None,
         last_modified_date: Optional[datetime] = None
     ):
-        """Update sync status record using Supabase."""
+        """Update sync status record using Supabase, writing only the fields given."""
         try:
             update_data = {
                 "status": status.value,
@@ -176,36 +243,60 @@ class SyncService:
                 "updated_records": updated_records,
                 "last_modified_date": last_modified_date.isoformat() if last_modified_date else None
             }
+            update_data = {key: value for key, value in update_data.items() if value is not None}
             
             # Set completed_at if status is terminal
             if status.value in ['completed', 'failed', 'cancelled']:
                 update_data["completed_at"] = datetime.now(timezone.utc).isoformat()
+            if status == SyncStatusEnum.COMPLETED:
+                self._last_sync_date_cache.clear()
             
-            db_manager.supabase.table("sync_status").update(update_data).eq("id", sync_id).execute()
+            # In a thread so the status write does not stall in-flight sync work
+            await asyncio.to_thread(
+                db_manager.supabase.table("sync_status").update(update_data, returning="minimal").eq("id", sync_id).execute
+            )
         except Exception as e:
             logger.error(f"Error updating sync status {sync_id}", error=str(e))
     
     async def _update_sync_status_error(self, sync_id: Optional[int], error_message: str):
-        """Update sync status with error using Supabase."""
+        """
+        Update sync status with error using Supabase.
+        
+        Without a sync_id the latest running sync is marked failed by the
+        mark_latest_running_failed RPC, which finds and updates it in one statement.
+        """
         try:
             if not sync_id:
-                # Find the latest running sync
-                result = db_manager.supabase.table("sync_status").select("id").eq("status", "running").order("started_at", desc=True).limit(1).execute()
-                
-                if not result.data:
-                    return
-                sync_id = result.data[0]["id"]
-            
-            update_data = {
-                "status": SyncStatusEnum.FAILED.value,
-                "error_message": error_message,
-                "completed_at": datetime.now(timezone.utc).isoformat()
-            }
-            
-            db_manager.supabase.table("sync_status").update(update_data).eq("id", sync_id).execute()
+                query = db_manager.supabase.rpc(
+                    "mark_latest_running_failed", {"error_message": error_message}
+                )
+            else:
+                update_data = {
+                    "status": SyncStatusEnum.FAILED.value,
+                    "error_message": error_message,
+                    "completed_at": datetime.now(timezone.utc).isoformat()
+                }
+                query = db_manager.supabase.table("sync_status").update(update_data, returning="minimal").eq("id", sync_id)
+            
+            await asyncio.to_thread(query.execute)
         except Exception as e:
             logger.error(f"Error updating sync status with error {sync_id}", error=str(e))
     
+    async def _record_sync_failure(self, sync_id: Optional[int], error_message: str):
+        """
+        Mark a sync failed even if the calling task is being cancelled.
+        
+        The write is shielded so a second cancellation cannot abandon it half way and
+        leave the row "running", and bounded so shutdown does not wait on Supabase.
+        """
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(self._update_sync_status_error(sync_id, error_message)),
+                timeout=TERMINAL_STATUS_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            logger.error("Timed out marking sync failed", sync_id=sync_id)
+    
     async def _perform_sync(self, sync_id: int, sync_type: SyncType):
         """Perform the actual synchronization."""
         try:
@@ -221,76 +312,40 @@ class SyncService:
             
         except asyncio.CancelledError:
             logger.info("Synchronization cancelled", sync_id=sync_id)
-            await self._update_sync_status_error(sync_id, "Synchronization cancelled")
+            await self._record_sync_failure(sync_id, "Synchronization cancelled")
             raise
         except Exception as e:
             logger.error(f"Synchronization failed", sync_id=sync_id, error=str(e))
-            await self._update_sync_status_error(sync_id, str(e))
+            await self._record_sync_failure(sync_id, str(e))
             raise
         finally:
             self._running_sync = None
+            # Synced rows (even from a partial run) make cached CVE reads stale right away
+            await asyncio.shield(cache_manager.invalidate())
     
     async def _perform_full_sync(self, sync_id: int, nvd_client: NVDClient):
         """Perform full synchronization of all CVE data."""
-        total_processed = 0
-        total_created = 0
-        total_updated = 0
-        batch = []
-        
         try:
-            # Get total count first for progress tracking
-            initial_response = await nvd_client.get_cves(results_per_page=1)
-            total_records = initial_response.total_results
-            
-            await self._update_sync_status(
-                sync_id, 
-                SyncStatusEnum.RUNNING, 
-                total_records=total_records
-            )
-            
-            logger.info(f"Full sync: processing {total_records} CVEs")
+            # The first NVD page reports the total, so progress needs no separate count request
+            async def record_total(total_records: int):
+                await self._update_sync_status(
+                    sync_id, 
+                    SyncStatusEnum.RUNNING, 
+                    total_records=total_records
+                )
+                logger.info(f"Full sync: processing {total_records} CVEs")
             
             # Process all CVEs in batches
-            async for cve_item in nvd_client.get_all_cves():
-                batch.append(cve_item)
-                
-                if len(batch) >= self.batch_size:
-                    created, updated = await self.cve_service.upsert_cves_batch(batch)
-                    total_created += created
-                    total_updated += updated
-                    total_processed += len(batch)
-                    
-                    # Update progress
-                    await self._update_sync_status(
-                        sync_id,
-                        SyncStatusEnum.RUNNING,
-                        total_records=total_records,
-                        processed_records=total_processed,
-                        new_records=total_created,
-                        updated_records=total_updated
-                    )
-                    
-                    logger.info(
-                        f"Full sync progress: {total_processed}/{total_records} CVEs processed"
-                    )
-                    
-                    batch = []
-                    
-                    # Rate limiting
-                    await asyncio.sleep(0.1)
-            
-            # Process remaining batch
-            if batch:
-                created, updated = await self.cve_service.upsert_cves_batch(batch)
-                total_created += created
-                total_updated += updated
-                total_processed += len(batch)
+            total_processed, total_created, total_updated = await self._upsert_batches(
+                sync_id,
+                nvd_client.get_all_cves_batched(batch_size=self.batch_size, on_total=record_total),
+                "Full sync"
+            )
             
             # Mark as completed
             await self._update_sync_status(
                 sync_id,
                 SyncStatusEnum.COMPLETED,
-                total_records=total_records,
                 processed_records=total_processed,
                 new_records=total_created,
                 updated_records=total_updated,
@@ -298,7 +353,8 @@ class SyncService:
             )
             
             logger.info(
-                f"Full sync completed: {total_created} created, {total_updated} updated"
+                f"Full sync completed: {total_created} created, {total_updated} updated, "
+                f"{total_processed - total_created - total_updated} unchanged or skipped"
             )
             
         except Exception as e:
@@ -315,10 +371,6 @@ class SyncService:
         
         logger.info(f"Incremental sync: fetching CVEs modified since {last_sync_date}")
         
-        total_processed = 0
-        total_created = 0
-        total_updated = 0
-        batch = []
         latest_modified = last_sync_date
         
         try:
@@ -326,120 +378,141 @@ class SyncService:
             start_date = last_sync_date
             end_date = datetime.now(timezone.utc)
             
-            # Get initial count
-            initial_response = await nvd_client.get_cves(
-                last_mod_start_date=start_date,
-                last_mod_end_date=end_date,
-                results_per_page=1
-            )
-            total_records = initial_response.total_results
-            
-            await self._update_sync_status(
-                sync_id,
-                SyncStatusEnum.RUNNING,
-                total_records=total_records
-            )
-            
-            if total_records == 0:
-                logger.info("Incremental sync: no new CVEs to process")
+            # The first NVD page reports the total, so progress needs no separate count request
+            async def record_total(total_records: int):
                 await self._update_sync_status(
                     sync_id,
-                    SyncStatusEnum.COMPLETED,
-                    total_records=0,
-                    processed_records=0,
-                    new_records=0,
-                    updated_records=0,
-                    last_modified_date=end_date
+                    SyncStatusEnum.RUNNING,
+                    total_records=total_records
                 )
-                return
-            
-            logger.info(f"Incremental sync: processing {total_records} modified CVEs")
+                if total_records == 0:
+                    logger.info("Incremental sync: no new CVEs to process")
+                else:
+                    logger.info(f"Incremental sync: processing {total_records} modified CVEs")
             
             # Process modified CVEs
-            async for cve_item in nvd_client.get_all_cves(
-                last_mod_start_date=start_date,
-                last_mod_end_date=end_date
-            ):
-                batch.append(cve_item)
-                
-                # Track latest modification date
-                cve_data = cve_item.cve
-                if 'lastModified' in cve_data:
-                    modified_date = datetime.fromisoformat(
-                        cve_data['lastModified'].replace('Z', '+00:00')
-                    )
-                    # Ensure timezone-aware datetime
-                    if modified_date.tzinfo is None:
-                        modified_date = modified_date.replace(tzinfo=timezone.utc)
-                    
-                    if modified_date > latest_modified:
-                        latest_modified = modified_date
-                
-                if len(batch) >= self.batch_size:
-                    created, updated = await self.cve_service.upsert_cves_batch(batch)
-                    total_created += created
-                    total_updated += updated
-                    total_processed += len(batch)
-                    
-                    # Update progress
-                    await self._update_sync_status(
-                        sync_id,
-                        SyncStatusEnum.RUNNING,
-                        total_records=total_records,
-                        processed_records=total_processed,
-                        new_records=total_created,
-                        updated_records=total_updated
-                    )
-                    
-                    logger.info(
-                        f"Incremental sync progress: {total_processed}/{total_records} CVEs processed"
+            # NVD writes every lastModified in one fixed-width UTC format, so the
+            # strings sort chronologically and only the newest needs parsing
+            latest_modified_raw = ""
+            
+            async def track_latest_modified(batches):
+                nonlocal latest_modified_raw
+                async for batch in batches:
+                    latest_modified_raw = max(
+                        latest_modified_raw,
+                        max((cve_item.cve.get('lastModified') or "" for cve_item in batch), default="")
                     )
-                    
-                    batch = []
-                    
-                    # Rate limiting
-                    await asyncio.sleep(0.1)
+                    yield batch
             
-            # Process remaining batch
-            if batch:
-                created, updated = await self.cve_service.upsert_cves_batch(batch)
-                total_created += created
-                total_updated += updated
-                total_processed += len(batch)
+            total_processed, total_created, total_updated = await self._upsert_batches(
+                sync_id,
+                track_latest_modified(nvd_client.get_all_cves_batched(
+                    batch_size=self.batch_size,
+                    on_total=record_total,
+                    last_mod_start_date=start_date,
+                    last_mod_end_date=end_date
+                )),
+                "Incremental sync"
+            )
+            if latest_modified_raw:
+                latest_modified = max(latest_modified, _parse_timestamp(latest_modified_raw))
             
-            # Mark as completed
+            # Mark as completed; with nothing modified, the window end is the new watermark
             await self._update_sync_status(
                 sync_id,
                 SyncStatusEnum.COMPLETED,
-                total_records=total_records,
                 processed_records=total_processed,
                 new_records=total_created,
                 updated_records=total_updated,
-                last_modified_date=latest_modified
+                last_modified_date=latest_modified if total_processed else end_date
             )
             
             logger.info(
-                f"Incremental sync completed: {total_created} created, {total_updated} updated"
+                f"Incremental sync completed: {total_created} created, {total_updated} updated, "
+                f"{total_processed - total_created - total_updated} unchanged or skipped"
             )
             
         except Exception as e:
             logger.error(f"Incremental sync failed", error=str(e))
             raise
     
+    async def _upsert_batches(
+        self,
+        sync_id: int,
+        batches: AsyncIterator[List[NVDVulnerability]],
+        label: str
+    ) -> Tuple[int, int, int]:
+        """
+        Upsert batches from an NVD iterator, up to max_concurrent_batches at a time.
+        
+        The iterator feeds a bounded queue drained by max_concurrent_batches workers,
+        so NVD fetching and Supabase writes overlap. Progress is recorded at most
+        every sync_progress_interval seconds, and always awaited, so no progress write
+        can land after the caller's final status update. Returns (processed, created,
+        updated); the first worker or producer error cancels the rest and is re-raised.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrent_batches)
+        totals = {"processed": 0, "created": 0, "updated": 0}
+        loop = asyncio.get_running_loop()
+        last_progress_at = loop.time()
+        
+        async def produce():
+            async for batch in batches:
+                await queue.put(batch)
+            for _ in range(self.max_concurrent_batches):
+                await queue.put(None)
+        
+        async def consume():
+            nonlocal last_progress_at
+            while (batch := await queue.get()) is not None:
+                created, updated = await self.cve_service.upsert_cves_batch(batch)
+                totals["processed"] += len(batch)
+                totals["created"] += created
+                totals["updated"] += updated
+                
+                # Progress is for the UI; the caller writes the final counts on completion
+                if loop.time() - last_progress_at < settings.sync_progress_interval:
+                    continue
+                last_progress_at = loop.time()
+                await self._update_sync_status(
+                    sync_id,
+                    SyncStatusEnum.RUNNING,
+                    processed_records=totals["processed"],
+                    new_records=totals["created"],
+                    updated_records=totals["updated"]
+                )
+                
+                logger.info(
+                    f"{label} progress: {totals['processed']} CVEs processed"
+                )
+        
+        tasks = [asyncio.create_task(produce())]
+        tasks += [asyncio.create_task(consume()) for _ in range(self.max_concurrent_batches)]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            # Stop the remaining workers on error or cancellation before returning
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        for task in done:
+            if task.exception() is not None:
+                raise task.exception()
+        
+        return totals["processed"], totals["created"], totals["updated"]
+    
     async def _get_last_sync_date(self) -> Optional[datetime]:
         """Get the date of the last successful synchronization using Supabase."""
+        cached = self._last_sync_date_cache.get("last_sync_date")
+        if cached is not None:
+            return cached
         try:
-            result = db_manager.supabase.table("sync_status").select("last_modified_date").eq("status", "completed").not_.is_("last_modified_date", "null").order("completed_at", desc=True).limit(1).execute()
+            result = await asyncio.to_thread(db_manager.supabase.table("sync_status").select("last_modified_date").eq("status", "completed").not_.is_("last_modified_date", "null").order("completed_at", desc=True).limit(1).execute)
             
             if result.data and len(result.data) > 0:
-                date_str = result.data[0]["last_modified_date"]
-                if date_str:
-                    # Ensure timezone-aware datetime
-                    dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                    if dt.tzinfo is None:
-                        dt = dt.replace(tzinfo=timezone.utc)
-                    return dt
-                return None
+                last_sync_date = _parse_timestamp(result.data[0]["last_modified_date"])
+                self._last_sync_date_cache.set("last_sync_date", last_sync_date)
+                return last_sync_date
             return None
         except Exception as e:
             logger.error("Error getting last sync date", error=str(e))
@@ -447,10 +520,12 @@ class SyncService:
     
     async def cleanup_old_sync_records(self, days_to_keep: int = 30):
         """Clean up old synchronization records using Supabase."""
+        deleted_count = 0
         try:
             cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_to_keep)
             
-            result = db_manager.supabase.table("sync_status").delete().lt("started_at", cutoff_date.isoformat()).in_("status", ["completed", "failed", "cancelled"]).execute()
+            query = db_manager.supabase.table("sync_status").delete().lt("started_at", cutoff_date.isoformat()).in_("status", ["completed", "failed", "cancelled"])
+            result = await asyncio.to_thread(returning_columns(query, "id").execute)
             
             deleted_count = len(result.data) if result.data else 0
             logger.info(f"Cleaned up {deleted_count} old sync records")
@@ -459,28 +534,58 @@ class SyncService:
         return deleted_count
 
 
+@lru_cache()
+def get_sync_service() -> SyncService:
+    """
+    Get the process-wide sync service.
+    
+    The API and the scheduler must share it: the running sync is tracked on the
+    instance, so a second instance could neither see nor cancel it.
+    """
+    return SyncService()
+
+
 # Scheduled sync task
 async def scheduled_sync_task():
     """Background task for scheduled synchronization."""
-    sync_service = SyncService()
+    sync_service = get_sync_service()
+    
+    try:
+        await _run_sync_schedule(sync_service)
+    finally:
+        # On shutdown, stop a sync started here rather than leave it running detached
+        if sync_service.is_sync_running():
+            await sync_service.cancel_running_sync()
+
+
+async def _run_sync_schedule(sync_service: SyncService):
+    """
+    Run scheduled syncs and the daily cleanup until cancelled.
     
+    Sleeps until the next sync or cleanup is due rather than polling.
+    """
+    last_cleanup_date = None
     while True:
+        wake_at = datetime.now(timezone.utc) + SYNC_RETRY_INTERVAL
         try:
-            if await sync_service.should_run_sync():
+            next_sync = await sync_service.next_sync_at()
+            if next_sync is not None and next_sync <= datetime.now(timezone.utc):
                 logger.info("Starting scheduled synchronization")
                 sync_trigger = SyncTrigger(sync_type="incremental")
                 await sync_service.trigger_sync(sync_trigger)
-                
-                # Wait for sync to complete
-                while sync_service.is_sync_running():
-                    await asyncio.sleep(10)
+                await sync_service.wait_for_running_sync()
+                next_sync = await sync_service.next_sync_at()
             
-            # Clean up old sync records weekly
-            if datetime.now(timezone.utc).hour == 2:  # Run at 2 AM
+            now = datetime.now(timezone.utc)
+            cleanup_at = now.replace(hour=SYNC_CLEANUP_HOUR, minute=0, second=0, microsecond=0)
+            if now >= cleanup_at and last_cleanup_date != now.date():
                 await sync_service.cleanup_old_sync_records()
+                last_cleanup_date = now.date()
+            if now >= cleanup_at:
+                cleanup_at += timedelta(days=1)
             
+            wake_at = min(cleanup_at, next_sync) if next_sync else cleanup_at
         except Exception as e:
             logger.error("Error in scheduled sync task", error=str(e))
         
-        # Wait before next check (check every hour)
-        await asyncio.sleep(3600)
+        await asyncio.sleep(max(0.0, (wake_at - datetime.now(timezone.utc)).total_seconds()))
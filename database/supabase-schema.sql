@@ -20,10 +20,12 @@ CREATE TABLE IF NOT EXISTS cves (
     cvss_v2_severity VARCHAR(20),
     cvss_v3_severity VARCHAR(20),
     cpe_configurations JSONB,
-    references JSONB,
+    cve_references JSONB,
     weaknesses JSONB,
     configurations JSONB,
     raw_data JSONB,
+    description_tsv TSVECTOR GENERATED ALWAYS AS (to_tsvector('english', coalesce(description, ''))) STORED,
+    published_year SMALLINT GENERATED ALWAYS AS (EXTRACT(year FROM published AT TIME ZONE 'UTC')::smallint) STORED,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -35,10 +37,22 @@ CREATE INDEX IF NOT EXISTS idx_cves_last_modified ON cves(last_modified);
 CREATE INDEX IF NOT EXISTS idx_cves_cvss_v2_score ON cves(cvss_v2_score);
 CREATE INDEX IF NOT EXISTS idx_cves_cvss_v3_score ON cves(cvss_v3_score);
 CREATE INDEX IF NOT EXISTS idx_cves_vuln_status ON cves(vuln_status);
-CREATE INDEX IF NOT EXISTS idx_cves_year ON cves(EXTRACT(year FROM published));
+
+-- Publication year (UTC) for databases created before published_year existed
+ALTER TABLE cves ADD COLUMN IF NOT EXISTS published_year SMALLINT
+    GENERATED ALWAYS AS (EXTRACT(year FROM published AT TIME ZONE 'UTC')::smallint) STORED;
+
+-- Year filters are an equality probe; published in the key serves the per-year ordering
+DROP INDEX IF EXISTS idx_cves_year;
+CREATE INDEX IF NOT EXISTS idx_cves_published_year ON cves(published_year, published);
+
+-- Full-text search column for databases created before description_tsv existed
+ALTER TABLE cves ADD COLUMN IF NOT EXISTS description_tsv TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('english', coalesce(description, ''))) STORED;
 
 -- Create a GIN index for full-text search on description
-CREATE INDEX IF NOT EXISTS idx_cves_description_fts ON cves USING gin(to_tsvector('english', description));
+DROP INDEX IF EXISTS idx_cves_description_fts;
+CREATE INDEX IF NOT EXISTS idx_cves_description_tsv ON cves USING gin(description_tsv);
 
 -- Sync status table - tracks synchronization operations
 CREATE TABLE IF NOT EXISTS sync_status (
@@ -121,13 +135,89 @@ BEGIN
         c.description,
         c.cvss_v3_score,
         c.published,
-        ts_rank(to_tsvector('english', c.description), plainto_tsquery('english', search_term)) as rank
+        ts_rank(c.description_tsv, plainto_tsquery('english', search_term)) as rank
     FROM cves c
-    WHERE to_tsvector('english', c.description) @@ plainto_tsquery('english', search_term)
+    WHERE c.description_tsv @@ plainto_tsquery('english', search_term)
     ORDER BY rank DESC;
 END;
 $$ LANGUAGE plpgsql;
 
+-- Ranked, keyset-paginated full-text search used by the /cves/search/ endpoint.
+-- Pass the rank and cve_id of the last row seen to fetch the next page.
+-- Returns only the columns the API serves (CVE_RESPONSE_COLUMNS in cve_service.py),
+-- leaving raw_data and description_tsv in the database.
+CREATE OR REPLACE FUNCTION search_cves_fts(
+    search_term TEXT,
+    result_limit INTEGER DEFAULT 20,
+    after_rank REAL DEFAULT NULL,
+    after_cve_id TEXT DEFAULT NULL
+)
+RETURNS TABLE(
+    id INTEGER,
+    cve_id VARCHAR,
+    source_identifier VARCHAR,
+    vuln_status VARCHAR,
+    published TIMESTAMP WITH TIME ZONE,
+    last_modified TIMESTAMP WITH TIME ZONE,
+    description TEXT,
+    cvss_v2_score NUMERIC,
+    cvss_v3_score NUMERIC,
+    cvss_v2_vector VARCHAR,
+    cvss_v3_vector VARCHAR,
+    cvss_v2_severity VARCHAR,
+    cvss_v3_severity VARCHAR,
+    cpe_configurations JSONB,
+    cve_references JSONB,
+    weaknesses JSONB,
+    configurations JSONB,
+    created_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE,
+    rank REAL
+) AS $$
+#variable_conflict use_column
+DECLARE
+    query TSQUERY := websearch_to_tsquery('english', search_term);
+BEGIN
+    -- websearch_to_tsquery returns an empty query when the input is only stop words
+    IF numnode(query) = 0 THEN
+        query := plainto_tsquery('english', search_term);
+    END IF;
+
+    RETURN QUERY
+    SELECT ranked.*
+    FROM (
+        SELECT
+            c.id, c.cve_id, c.source_identifier, c.vuln_status, c.published, c.last_modified,
+            c.description, c.cvss_v2_score, c.cvss_v3_score, c.cvss_v2_vector, c.cvss_v3_vector,
+            c.cvss_v2_severity, c.cvss_v3_severity, c.cpe_configurations, c.cve_references,
+            c.weaknesses, c.configurations, c.created_at, c.updated_at,
+            ts_rank(c.description_tsv, query) AS rank
+        FROM cves c
+        WHERE c.description_tsv @@ query
+    ) ranked
+    WHERE after_rank IS NULL
+       OR (ranked.rank, ranked.cve_id) < (after_rank, after_cve_id)
+    ORDER BY ranked.rank DESC, ranked.cve_id DESC
+    LIMIT result_limit;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Mark the most recently started running sync as failed in one statement.
+-- Returns the id of the row updated, or NULL when no sync is running.
+CREATE OR REPLACE FUNCTION mark_latest_running_failed(error_message TEXT)
+RETURNS INTEGER AS $$
+    UPDATE sync_status s
+    SET status = 'failed', error_message = mark_latest_running_failed.error_message, completed_at = NOW()
+    WHERE s.id = (
+        SELECT id FROM sync_status
+        WHERE status = 'running'
+        ORDER BY started_at DESC
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING s.id;
+$$ LANGUAGE sql;
+
 -- Insert initial sync status record if table is empty
 INSERT INTO sync_status (sync_type, status, total_records, processed_records)
 SELECT 'initial', 'pending', 0, 0
@@ -19,6 +19,7 @@ def start_backend():
         "app.main:app", 
         "--host", "0.0.0.0", 
         "--port", "8000", 
+        "--loop", "uvloop",
         "--reload"
     ]
     return subprocess.Popen(backend_cmd, cwd=os.getcwd())